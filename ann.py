@@ -0,0 +1,196 @@
+# ann.py
+
+import numpy as np
+
+# =============================================================================
+# APPROXIMATE NEAREST NEIGHBOUR (IVF-PQ) MURNI NUMPY
+# =============================================================================
+# Coarse quantizer (k-means, `nlist` sel) membagi galeri menjadi inverted list.
+# Residual tiap encoding terhadap centroid selnya dikompresi dengan product
+# quantization (`m` sub-vektor x 256 centroid = `m` byte per wajah). Saat
+# pencarian hanya `nprobe` sel terdekat yang dipindai dengan tabel jarak
+# asimetris (ADC), lalu `rerank` kandidat teratas dihitung ulang secara eksak
+# memakai vektor asli dari indeks galeri.
+
+
+def _nearest(vectors, centroids, chunk_size=32768):
+    """Mengembalikan indeks centroid terdekat untuk setiap vektor (diproses per blok)."""
+    c_sq = np.einsum('ij,ij->i', centroids, centroids)
+    assign = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), chunk_size):
+        block = vectors[start:start + chunk_size]
+        # |x|^2 konstan per baris sehingga tidak perlu dihitung untuk argmin
+        scores = block @ centroids.T
+        scores *= -2.0
+        scores += c_sq
+        assign[start:start + chunk_size] = scores.argmin(axis=1)
+    return assign
+
+
+def kmeans(vectors, k, iterations=10, seed=0):
+    """K-means Lloyd sederhana; klaster kosong diisi ulang dengan titik acak."""
+    rng = np.random.default_rng(seed)
+    vectors = np.asarray(vectors, dtype=np.float32)
+    centroids = vectors[rng.choice(len(vectors), k, replace=False)].copy()
+    for _ in range(iterations):
+        assign = _nearest(vectors, centroids)
+        counts = np.bincount(assign, minlength=k)
+        nonempty = counts > 0
+        order = np.argsort(assign, kind='stable')
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        sums = np.add.reduceat(vectors[order], starts[nonempty], axis=0)
+        centroids[nonempty] = sums / counts[nonempty, None]
+        empty = np.flatnonzero(~nonempty)
+        if len(empty):
+            centroids[empty] = vectors[rng.choice(len(vectors), len(empty), replace=False)]
+    return centroids
+
+
+class IVFPQIndex:
+    """
+    Indeks IVF-PQ untuk encoding 128 dimensi. Hanya menyimpan kode PQ (uint8)
+    dan ID per inverted list; vektor asli untuk re-ranking tetap berada di
+    `GalleryIndex` yang memakai indeks ini.
+    """
+
+    def __init__(self, dim=128, nlist=1024, m=16, nprobe=16, rerank=256,
+                 train_size=100000, iterations=10, seed=0):
+        if dim % m != 0:
+            raise ValueError('dim harus habis dibagi m')
+        self.dim = dim
+        self.nlist = nlist
+        self.m = m
+        self.dsub = dim // m
+        self.ksub = 256
+        self.nprobe = nprobe
+        self.rerank = rerank
+        self.train_size = train_size
+        self.iterations = iterations
+        self.seed = seed
+        self.trained = False
+        self.centroids = None
+        self.codebooks = None
+        self._list_ids = []
+        self._list_codes = []
+        self._list_sizes = None
+        self._location = {}
+
+    def __len__(self):
+        return len(self._location)
+
+    @property
+    def min_train_size(self):
+        """Jumlah minimum vektor agar coarse quantizer dan codebook PQ bisa dilatih."""
+        return max(self.nlist, self.ksub) * 4
+
+    # -------------------------------------------------------------------------
+    # Pelatihan
+    # -------------------------------------------------------------------------
+    def train(self, vectors):
+        """Melatih coarse quantizer dan codebook PQ dari sampel galeri."""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        if len(vectors) < self.min_train_size:
+            raise ValueError(f'Butuh minimal {self.min_train_size} encoding untuk melatih IVF-PQ')
+        rng = np.random.default_rng(self.seed)
+        if len(vectors) > self.train_size:
+            vectors = vectors[rng.choice(len(vectors), self.train_size, replace=False)]
+
+        self.centroids = kmeans(vectors, self.nlist, self.iterations, self.seed)
+        residuals = vectors - self.centroids[_nearest(vectors, self.centroids)]
+        self.codebooks = np.stack([
+            kmeans(residuals[:, i * self.dsub:(i + 1) * self.dsub], self.ksub, self.iterations, self.seed + i)
+            for i in range(self.m)
+        ])
+        self._list_ids = [np.empty(0, dtype=np.int64) for _ in range(self.nlist)]
+        self._list_codes = [np.empty((0, self.m), dtype=np.uint8) for _ in range(self.nlist)]
+        self._list_sizes = np.zeros(self.nlist, dtype=np.int64)
+        self._location = {}
+        self.trained = True
+
+    def _encode(self, vectors, lists):
+        residuals = vectors - self.centroids[lists]
+        codes = np.empty((len(vectors), self.m), dtype=np.uint8)
+        for i in range(self.m):
+            codes[:, i] = _nearest(residuals[:, i * self.dsub:(i + 1) * self.dsub], self.codebooks[i])
+        return codes
+
+    # -------------------------------------------------------------------------
+    # Perubahan inkremental
+    # -------------------------------------------------------------------------
+    def add(self, ids, vectors):
+        """Menambahkan (atau mengganti) banyak encoding sekaligus."""
+        ids = np.asarray(ids, dtype=np.int64).reshape(-1)
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        for face_id in ids:
+            self.remove(face_id)
+        lists = _nearest(vectors, self.centroids)
+        codes = self._encode(vectors, lists)
+        for list_no in np.unique(lists):
+            members = np.flatnonzero(lists == list_no)
+            self._append(int(list_no), ids[members], codes[members])
+
+    def _append(self, list_no, ids, codes):
+        size = self._list_sizes[list_no]
+        needed = size + len(ids)
+        if needed > len(self._list_ids[list_no]):
+            capacity = max(needed, 2 * len(self._list_ids[list_no]), 16)
+            list_ids = np.empty(capacity, dtype=np.int64)
+            list_codes = np.empty((capacity, self.m), dtype=np.uint8)
+            list_ids[:size] = self._list_ids[list_no][:size]
+            list_codes[:size] = self._list_codes[list_no][:size]
+            self._list_ids[list_no], self._list_codes[list_no] = list_ids, list_codes
+        self._list_ids[list_no][size:needed] = ids
+        self._list_codes[list_no][size:needed] = codes
+        for offset, face_id in enumerate(ids):
+            self._location[int(face_id)] = (list_no, size + offset)
+        self._list_sizes[list_no] = needed
+
+    def remove(self, face_id):
+        """Menghapus encoding dari inverted list-nya (tukar dengan elemen terakhir)."""
+        location = self._location.pop(int(face_id), None)
+        if location is None:
+            return False
+        list_no, pos = location
+        last = self._list_sizes[list_no] - 1
+        if pos != last:
+            moved_id = int(self._list_ids[list_no][last])
+            self._list_ids[list_no][pos] = moved_id
+            self._list_codes[list_no][pos] = self._list_codes[list_no][last]
+            self._location[moved_id] = (list_no, pos)
+        self._list_sizes[list_no] = last
+        return True
+
+    # -------------------------------------------------------------------------
+    # Pencarian
+    # -------------------------------------------------------------------------
+    def candidates(self, query, nprobe=None, rerank=None):
+        """
+        Mengembalikan ID kandidat (maksimal `rerank`) dari `nprobe` sel terdekat,
+        terurut berdasarkan jarak perkiraan PQ.
+        """
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        rerank = rerank or self.rerank
+        query = np.asarray(query, dtype=np.float32).reshape(self.dim)
+
+        coarse = np.einsum('ij,ij->i', self.centroids, self.centroids) - 2.0 * (self.centroids @ query)
+        probes = np.argpartition(coarse, nprobe - 1)[:nprobe] if nprobe < self.nlist else np.arange(self.nlist)
+
+        probes = probes[self._list_sizes[probes] > 0]
+        if len(probes) == 0:
+            return np.empty(0, dtype=np.int64)
+
+        # Tabel jarak (nprobe, m, 256) antara sub-residual query dan setiap centroid PQ,
+        # dihitung sekaligus untuk semua sel yang dipindai
+        residuals = (query - self.centroids[probes]).reshape(len(probes), self.m, 1, self.dsub)
+        tables = ((self.codebooks[None] - residuals) ** 2).sum(axis=3)
+
+        sizes = self._list_sizes[probes]
+        codes = np.concatenate([self._list_codes[list_no][:size] for list_no, size in zip(probes, sizes)])
+        ids = np.concatenate([self._list_ids[list_no][:size] for list_no, size in zip(probes, sizes)])
+        owner = np.repeat(np.arange(len(probes)), sizes)
+        dists = tables[owner[:, None], np.arange(self.m), codes].sum(axis=1)
+
+        if len(ids) > rerank:
+            shortlist = np.argpartition(dists, rerank - 1)[:rerank]
+            ids, dists = ids[shortlist], dists[shortlist]
+        return ids[np.argsort(dists, kind='stable')]
@@ -0,0 +1,34 @@
+# api_helpers.py
+
+import logging
+
+from flask import current_app, request
+
+from app_config import ALLOWED_EXTENSIONS
+
+# =============================================================================
+# FUNGSI BANTUAN ENDPOINT (DIPAKAI BERSAMA flaskapp & LivenessFlask)
+# =============================================================================
+def allowed_file(filename):
+    """Memeriksa apakah ekstensi file diizinkan."""
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+
+def request_profile(selector, kind):
+    """
+    Profil deteksi untuk request ini dari `selector` (ProfileSelector): `profile`
+    (form / query) jika dikirim, atau profil paling akurat yang muat dalam
+    `latency_budget_ms`, atau profil default endpoint `kind` ('compare' /
+    'register' / 'stream'). Melempar ValueError jika input tidak valid.
+    """
+    name = request.values.get('profile', '').strip() or None
+    budget_raw = request.values.get('latency_budget_ms', '').strip()
+    try:
+        budget = float(budget_raw) if budget_raw else None
+    except ValueError:
+        raise ValueError('latency_budget_ms harus berupa angka')
+    return selector.choose(name, budget, default=current_app.config[f'DETECTION_PROFILE_{kind.upper()}'])
+
+def busy_response(error):
+    """Respons 503 + Retry-After saat pool inferensi penuh atau batas waktu terlampaui."""
+    logging.warning(f"Inferensi ditolak: {error}")
+    return {'message': 'Server sedang sibuk. Silakan coba lagi.'}, 503, {'Retry-After': str(error.retry_after)}
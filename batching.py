@@ -0,0 +1,103 @@
+# batching.py
+
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future
+
+# =============================================================================
+# PENJADWAL MICRO-BATCHING
+# =============================================================================
+class MicroBatcher:
+    """
+    Mengumpulkan request yang datang dalam jendela waktu singkat (`window_ms`)
+    menjadi satu panggilan `process_batch(items)`, lalu mengembalikan hasil
+    masing-masing ke pemanggilnya. `process_batch` harus mengembalikan list hasil
+    dengan urutan yang sama; jika melempar exception, semua pemanggil di batch
+    itu menerima exception yang sama.
+    """
+
+    def __init__(self, process_batch, window_ms=10, max_batch_size=16, name='micro-batcher'):
+        self.process_batch = process_batch
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self.name = name
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+        # Metrik
+        self._stats_lock = threading.Lock()
+        self._batch_sizes = Counter()
+        self._delays = deque(maxlen=2048)
+        self._items_total = 0
+        self._batches_total = 0
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+            self._thread.start()
+
+    def submit(self, item, timeout=None):
+        """Menitipkan satu item ke batch berikutnya dan menunggu hasilnya."""
+        future = Future()
+        with self._cond:
+            self._ensure_thread()
+            self._queue.append((item, future, time.perf_counter()))
+            self._cond.notify()
+        return future.result(timeout=timeout)
+
+    def _next_batch(self):
+        with self._cond:
+            while not self._queue:
+                self._cond.wait()
+            # Item pertama membuka jendela; tunggu item lain sampai jendela habis atau batch penuh
+            deadline = self._queue[0][2] + self.window
+            while len(self._queue) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            count = min(len(self._queue), self.max_batch_size)
+            return [self._queue.popleft() for _ in range(count)]
+
+    def _loop(self):
+        while True:
+            batch = self._next_batch()
+            started = time.perf_counter()
+            with self._stats_lock:
+                self._batches_total += 1
+                self._items_total += len(batch)
+                self._batch_sizes[len(batch)] += 1
+                self._delays.extend(started - queued_at for _, _, queued_at in batch)
+
+            try:
+                results = self.process_batch([item for item, _, _ in batch])
+            except BaseException as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future, _), result in zip(batch, results):
+                future.set_result(result)
+
+    def stats(self):
+        """Ringkasan metrik: distribusi ukuran batch dan delay antrian (ms)."""
+        with self._stats_lock:
+            delays = sorted(self._delays)
+            sizes = dict(sorted(self._batch_sizes.items()))
+            batches, items = self._batches_total, self._items_total
+
+        def percentile(p):
+            if not delays:
+                return 0.0
+            return round(delays[min(len(delays) - 1, int(p / 100.0 * len(delays)))] * 1000.0, 3)
+
+        return {
+            'window_ms': self.window * 1000.0,
+            'max_batch_size': self.max_batch_size,
+            'batches_total': batches,
+            'items_total': items,
+            'avg_batch_size': round(items / batches, 3) if batches else 0.0,
+            'batch_size_histogram': sizes,
+            'queue_delay_ms': {'p50': percentile(50), 'p95': percentile(95), 'p99': percentile(99),
+                               'max': round(delays[-1] * 1000.0, 3) if delays else 0.0},
+        }
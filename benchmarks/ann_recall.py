@@ -0,0 +1,103 @@
+# benchmarks/ann_recall.py
+"""
+Benchmark recall vs latensi pencarian IVF-PQ terhadap pencarian eksak.
+
+Cara menjalankan (dari root proyek):
+    python benchmarks/ann_recall.py --size 1000000 --nlist 1024 --nprobe 4 8 16 32
+    python benchmarks/ann_recall.py --size 100000 --output ann_100k.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ann import IVFPQIndex
+from gallery import GalleryIndex
+from synthetic import synthetic_gallery, synthetic_queries
+
+
+def _latency_stats(samples):
+    samples = np.asarray(samples) * 1000.0
+    return {
+        'mean_ms': round(float(samples.mean()), 3),
+        'p50_ms': round(float(np.percentile(samples, 50)), 3),
+        'p95_ms': round(float(np.percentile(samples, 95)), 3),
+        'p99_ms': round(float(np.percentile(samples, 99)), 3),
+    }
+
+
+def _run_queries(gallery, queries, tolerance):
+    results, timings = [], []
+    for query in queries:
+        started = time.perf_counter()
+        results.append(gallery.best_match(query, tolerance=tolerance))
+        timings.append(time.perf_counter() - started)
+    return results, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=100000, help='Jumlah identitas di galeri sintetis.')
+    parser.add_argument('--queries', type=int, default=500, help='Jumlah query.')
+    parser.add_argument('--tolerance', type=float, default=0.4)
+    parser.add_argument('--nlist', type=int, default=1024)
+    parser.add_argument('--m', type=int, default=16)
+    parser.add_argument('--nprobe', type=int, nargs='+', default=[1, 4, 8, 16, 32, 64])
+    parser.add_argument('--rerank', type=int, nargs='+', default=[64, 256])
+    parser.add_argument('--output', help='Simpan hasil sebagai JSON.')
+    args = parser.parse_args()
+
+    ids, encodings = synthetic_gallery(args.size)
+    _, queries = synthetic_queries(encodings, args.queries)
+
+    exact = GalleryIndex()
+    exact.build(ids, encodings)
+    exact_results, exact_timings = _run_queries(exact, queries, args.tolerance)
+    matched = sum(result is not None for result in exact_results)
+    print(f"Galeri: {args.size} identitas, {args.queries} query, {matched} cocok secara eksak (tol {args.tolerance})")
+    print(f"Eksak : {_latency_stats(exact_timings)}")
+
+    ann_gallery = GalleryIndex()
+    ann_gallery.ann = IVFPQIndex(nlist=args.nlist, m=args.m)
+    started = time.perf_counter()
+    ann_gallery.build(ids, encodings)
+    train_seconds = time.perf_counter() - started
+    print(f"Pelatihan IVF-PQ (nlist={args.nlist}, m={args.m}): {train_seconds:.1f} detik")
+
+    report = {
+        'size': args.size,
+        'queries': args.queries,
+        'tolerance': args.tolerance,
+        'exact': _latency_stats(exact_timings),
+        'ann_train_seconds': round(train_seconds, 2),
+        'ann': [],
+    }
+    print(f"{'nprobe':>6} {'rerank':>6} {'recall@tol':>10} {'mean_ms':>8} {'p95_ms':>8}")
+    for rerank in args.rerank:
+        for nprobe in args.nprobe:
+            ann_gallery.ann.nprobe = nprobe
+            ann_gallery.ann.rerank = rerank
+            results, timings = _run_queries(ann_gallery, queries, args.tolerance)
+            # Recall: porsi query yang hasil ANN-nya sama dengan hasil eksak
+            hits = sum(
+                1 for got, expected in zip(results, exact_results)
+                if expected is not None and got is not None and got[0] == expected[0]
+            )
+            recall = hits / matched if matched else 1.0
+            stats = _latency_stats(timings)
+            print(f"{nprobe:>6} {rerank:>6} {recall:>10.4f} {stats['mean_ms']:>8.3f} {stats['p95_ms']:>8.3f}")
+            report['ann'].append({'nprobe': nprobe, 'rerank': rerank, 'recall': round(recall, 4), **stats})
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Hasil disimpan ke {args.output}")
+
+
+if __name__ == '__main__':
+    main()
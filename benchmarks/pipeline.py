@@ -0,0 +1,400 @@
+# benchmarks/pipeline.py
+"""
+Benchmark offline pipeline pengenalan wajah (CPU saja). Endpoint dipanggil lewat
+Flask test client in-process dengan database SQLite sementara, galeri berisi
+encoding sintetis (default 1k/10k/100k/1M identitas), dan foto hasil generate
+(atau folder foto sendiri). Rincian per tahap diambil dari header Server-Timing.
+
+Cara menjalankan (dari root proyek):
+    python benchmarks/pipeline.py --output hasil.json
+    python benchmarks/pipeline.py --sizes 1000 10000 --requests 50 --images /path/foto
+    python benchmarks/pipeline.py --scales 0.25 0.5 0.75 1.0
+    python benchmarks/pipeline.py --profiles fast balanced accurate
+
+Membandingkan dua hasil (mis. sebelum dan sesudah sebuah commit):
+    python benchmarks/pipeline.py --compare base.json hasil.json
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from face_codec import encode_encoding
+from synthetic import synthetic_gallery, synthetic_queries
+
+ENDPOINTS = ('compare', 'compare_direct', 'compare_batch', 'register', 'face_detail')
+
+
+def _latency_stats(samples):
+    samples = np.asarray(samples) * 1000.0
+    if len(samples) == 0:
+        return {}
+    return {
+        'mean_ms': round(float(samples.mean()), 3),
+        'p50_ms': round(float(np.percentile(samples, 50)), 3),
+        'p95_ms': round(float(np.percentile(samples, 95)), 3),
+        'p99_ms': round(float(np.percentile(samples, 99)), 3),
+    }
+
+
+def git_revision():
+    """Commit saat ini (untuk membandingkan hasil antar commit), atau None."""
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# =============================================================================
+# SET FOTO
+# =============================================================================
+def generate_face_images(count, seed=0, size=(480, 640)):
+    """
+    Membuat foto sintetis berupa wajah kartun (oval, mata, alis, hidung, mulut)
+    di atas latar bernoise. Tidak semua akan terdeteksi sebagai wajah oleh HOG;
+    jumlah yang terdeteksi dilaporkan terpisah. Mengembalikan list (nama, bytes JPEG).
+    """
+    rng = np.random.default_rng(seed)
+    height, width = size
+    images = []
+    for i in range(count):
+        image = np.empty((height, width, 3), dtype=np.uint8)
+        image[:] = rng.integers(60, 200, size=3)
+        image = cv2.add(image, rng.integers(0, 25, size=image.shape, dtype=np.uint8))
+
+        cx, cy = width // 2 + int(rng.integers(-40, 40)), height // 2 + int(rng.integers(-30, 30))
+        fw, fh = int(rng.integers(90, 120)), int(rng.integers(120, 150))
+        skin = tuple(int(v) for v in rng.integers([90, 130, 170], [140, 180, 230]))
+        cv2.ellipse(image, (cx, cy), (fw, fh), 0, 0, 360, skin, -1)
+        for side in (-1, 1):
+            ex, ey = cx + side * fw // 2 - side * 8, cy - fh // 5
+            cv2.ellipse(image, (ex, ey), (22, 11), 0, 0, 360, (245, 245, 245), -1)
+            cv2.circle(image, (ex, ey), 7, (40, 30, 20), -1)
+            cv2.line(image, (ex - 24, ey - 24), (ex + 24, ey - 28 + side * 2), (40, 40, 50), 5)
+        cv2.line(image, (cx, cy - 10), (cx - 8, cy + fh // 4), (70, 90, 130), 3)
+        cv2.ellipse(image, (cx, cy + fh // 2), (fw // 3, 14), 0, 10, 170, (60, 60, 160), 4)
+        image = cv2.GaussianBlur(image, (5, 5), 0)
+        images.append((f'synthetic_{i:03d}.jpg', cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, 90])[1].tobytes()))
+    return images
+
+
+def load_images(directory):
+    """Membaca foto (jpg/jpeg/png) dari folder sebagai list (nama, bytes)."""
+    images = []
+    for name in sorted(os.listdir(directory)):
+        if name.rsplit('.', 1)[-1].lower() in ('jpg', 'jpeg', 'png'):
+            with open(os.path.join(directory, name), 'rb') as f:
+                images.append((name, f.read()))
+    if not images:
+        raise SystemExit(f"Tidak ada foto jpg/png di {directory}")
+    return images
+
+
+# =============================================================================
+# PERSIAPAN APLIKASI
+# =============================================================================
+def prepare_app(workdir, workers):
+    """
+    Mengimpor flaskapp dengan database SQLite di `workdir`. Cache hasil dimatikan
+    agar setiap request menjalankan pipeline penuh; Server-Timing diaktifkan.
+    """
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(workdir, 'benchmark.db')
+    os.environ['METRICS_TIMING_HEADER'] = '1'
+    os.environ['RESULT_CACHE_MAX_MB'] = '0'
+    os.environ['INFERENCE_WORKERS'] = str(workers)
+    os.environ.setdefault('INFERENCE_TIMEOUT', '120')
+    # Folder uploads/ & static/ dibuat relatif terhadap direktori kerja
+    os.chdir(workdir)
+    import flaskapp
+    return flaskapp
+
+
+def populate_gallery(flaskapp, size, chunk_size=10000):
+    """Mengisi database dengan `size` identitas sintetis lalu memuat indeks galeri."""
+    from models import db, RegisteredFace
+
+    ids, encodings = synthetic_gallery(size)
+    table = RegisteredFace.__table__
+    with flaskapp.app.app_context():
+        db.drop_all()
+        db.create_all()
+        started = time.perf_counter()
+        for start in range(0, size, chunk_size):
+            rows = [{
+                'id': int(face_id), 'nama': f'Sintetis {face_id}', 'id_member': int(face_id) % 100,
+                'file_path': '', 'url_face_img': None, 'face_encoding': '', 'face_encoding_bin': encode_encoding(encoding)
+            } for face_id, encoding in zip(ids[start:start + chunk_size], encodings[start:start + chunk_size])]
+            db.session.execute(table.insert(), rows)
+        db.session.commit()
+        insert_seconds = time.perf_counter() - started
+
+        flaskapp.gallery.loaded = False
+        flaskapp.known_faces.clear()
+        started = time.perf_counter()
+        flaskapp.get_gallery()
+        load_seconds = time.perf_counter() - started
+    return ids, encodings, {'db_insert_seconds': round(insert_seconds, 3), 'gallery_load_seconds': round(load_seconds, 3)}
+
+
+# =============================================================================
+# PENGUKURAN
+# =============================================================================
+def parse_server_timing(header):
+    """'decode;dur=1.20, detect;dur=3.40' -> {'decode': 0.0012, 'detect': 0.0034} (detik)."""
+    timings = {}
+    for part in (header or '').split(','):
+        name, _, duration = part.strip().partition(';dur=')
+        if name and duration:
+            timings[name] = float(duration) / 1000.0
+    return timings
+
+
+def bench_endpoint(client, make_request, count):
+    """Menjalankan `count` request berurutan; latensi klien, status, dan rincian tahap."""
+    latencies, statuses, stages = [], {}, {}
+    started = time.perf_counter()
+    for i in range(count):
+        request_started = time.perf_counter()
+        response = make_request(client, i)
+        latencies.append(time.perf_counter() - request_started)
+        statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+        for name, seconds in parse_server_timing(response.headers.get('Server-Timing')).items():
+            if name != 'total':
+                stages.setdefault(name, []).append(seconds)
+    elapsed = time.perf_counter() - started
+    return {
+        'requests': count,
+        'throughput_rps': round(count / elapsed, 2) if elapsed else 0.0,
+        'status': statuses,
+        'latency': _latency_stats(latencies),
+        'stages': {name: {'count': len(samples), **_latency_stats(samples)} for name, samples in sorted(stages.items())},
+    }
+
+
+def endpoint_requests(ids, images, batch_size, seed=0):
+    """Pembuat request per endpoint; ID dan foto dipilih acak tapi deterministik."""
+    rng = np.random.default_rng(seed)
+    user_ids = rng.choice(ids, size=4096)
+    next_id = int(ids.max()) + 1
+
+    def photo(i):
+        name, data = images[i % len(images)]
+        return (io.BytesIO(data), name)
+
+    def post(client, url, data):
+        return client.post(url, data=data, content_type='multipart/form-data')
+
+    return {
+        'compare': lambda c, i: post(c, '/api/compare', {'user_id': str(user_ids[i % len(user_ids)]), 'photo': photo(i)}),
+        'compare_direct': lambda c, i: post(c, '/api/compare_direct', {'photo': photo(i)}),
+        'compare_batch': lambda c, i: post(c, '/api/compare_batch', {'photo': [photo(i * batch_size + k) for k in range(batch_size)]}),
+        'register': lambda c, i: post(c, '/api/register', {'id': str(next_id + i), 'name': f'Benchmark {i}', 'photo': photo(i)}),
+        'face_detail': lambda c, i: c.get(f'/api/faces/{user_ids[i % len(user_ids)]}'),
+    }
+
+
+def bench_search(flaskapp, encodings, count):
+    """Pencarian 1:N di indeks galeri dan pencocokan 1:1, tanpa HTTP/deteksi."""
+    picks, queries = synthetic_queries(encodings, count)
+    index = flaskapp.get_gallery()
+    search, verify = [], []
+    for pick, query in zip(picks, queries):
+        started = time.perf_counter()
+        index.search(query, top_k=1, tolerance=0.4)
+        search.append(time.perf_counter() - started)
+        started = time.perf_counter()
+        flaskapp.match_encoding(query, encodings[pick])
+        verify.append(time.perf_counter() - started)
+    return {'gallery_search': _latency_stats(search), 'verify_1to1': _latency_stats(verify)}
+
+
+def bench_scales(flaskapp, images, scales):
+    """Waktu deteksi + encoding (in-process) untuk beberapa faktor resize foto."""
+    from metrics import start_timings, stop_timings
+
+    decoded = [cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR) for _, data in images]
+    report = []
+    for scale in scales:
+        totals, stages, faces = [], {}, 0
+        for image in decoded:
+            started = time.perf_counter()
+            start_timings()
+            resized = cv2.resize(image, (0, 0), fx=scale, fy=scale) if scale != 1.0 else image
+            encodings, _ = flaskapp.detect_face_encodings(resized)
+            timings = stop_timings()
+            totals.append(time.perf_counter() - started)
+            faces += bool(encodings)
+            for name, seconds in timings.items():
+                stages.setdefault(name, []).append(seconds)
+        report.append({
+            'scale': scale,
+            'images': len(decoded),
+            'images_with_face': faces,
+            'total': _latency_stats(totals),
+            'stages': {name: _latency_stats(samples) for name, samples in sorted(stages.items())},
+        })
+        print(f"  resize {scale:<5} wajah {faces}/{len(decoded)}  p50 {report[-1]['total'].get('p50_ms')} ms")
+    return report
+
+
+def bench_profiles(flaskapp, images, names):
+    """Waktu deteksi (gambar diperkecil) + encoding (potongan resolusi penuh) per profil deteksi."""
+    from metrics import start_timings, stop_timings
+
+    decoded = [cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR) for _, data in images]
+    report = []
+    for name in names:
+        profile = flaskapp.profile_selector.get(name)
+        totals, stages, faces = [], {}, 0
+        for image in decoded:
+            started = time.perf_counter()
+            start_timings()
+            encodings, _ = flaskapp.detect_face_encodings(image, profile)
+            timings = stop_timings()
+            totals.append(time.perf_counter() - started)
+            faces += bool(encodings)
+            for stage_name, seconds in timings.items():
+                stages.setdefault(stage_name, []).append(seconds)
+        report.append({
+            'profile': name,
+            **profile.to_dict(),
+            'images': len(decoded),
+            'images_with_face': faces,
+            'total': _latency_stats(totals),
+            'stages': {stage_name: _latency_stats(samples) for stage_name, samples in sorted(stages.items())},
+        })
+        print(f"  profil {name:<9} wajah {faces}/{len(decoded)}  p50 {report[-1]['total'].get('p50_ms')} ms")
+    return report
+
+
+# =============================================================================
+# PERBANDINGAN HASIL
+# =============================================================================
+def compare_reports(base_path, new_path):
+    """Mencetak perubahan p50 per ukuran galeri, endpoint, dan tahap antara dua hasil."""
+    with open(base_path) as f:
+        base = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    print(f"Base: {base['meta'].get('git_revision')}  Baru: {new['meta'].get('git_revision')}")
+
+    def delta(old, current):
+        if not old or current is None:
+            return '-'
+        return f"{(current - old) / old * 100.0:+.1f}%"
+
+    base_sizes = {entry['size']: entry for entry in base['sizes']}
+    for entry in new['sizes']:
+        old_entry = base_sizes.get(entry['size'])
+        if old_entry is None:
+            continue
+        print(f"\n== Galeri {entry['size']} identitas")
+        for name, result in entry['endpoints'].items():
+            old_result = old_entry['endpoints'].get(name)
+            if not old_result:
+                continue
+            old_p50, new_p50 = old_result['latency'].get('p50_ms'), result['latency'].get('p50_ms')
+            print(f"  {name:<16} p50 {old_p50} -> {new_p50} ms ({delta(old_p50, new_p50)})")
+            for stage_name, stage in result['stages'].items():
+                old_stage = old_result['stages'].get(stage_name, {})
+                print(f"    {stage_name:<14} p50 {old_stage.get('p50_ms')} -> {stage.get('p50_ms')} ms "
+                      f"({delta(old_stage.get('p50_ms'), stage.get('p50_ms'))})")
+        for name, result in entry.get('search', {}).items():
+            old_p50 = old_entry.get('search', {}).get(name, {}).get('p50_ms')
+            print(f"  {name:<16} p50 {old_p50} -> {result.get('p50_ms')} ms ({delta(old_p50, result.get('p50_ms'))})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000, 1000000],
+                        help='Ukuran galeri sintetis (jumlah identitas).')
+    parser.add_argument('--requests', type=int, default=30, help='Jumlah request per endpoint per ukuran galeri.')
+    parser.add_argument('--endpoints', nargs='+', choices=ENDPOINTS, default=list(ENDPOINTS))
+    parser.add_argument('--batch-size', type=int, default=8, help='Jumlah foto per request /api/compare_batch.')
+    parser.add_argument('--search-queries', type=int, default=200, help='Jumlah query benchmark pencarian galeri.')
+    parser.add_argument('--images', help='Folder foto (jpg/png); default foto sintetis hasil generate.')
+    parser.add_argument('--num-images', type=int, default=16, help='Jumlah foto sintetis jika --images tidak diisi.')
+    parser.add_argument('--scales', type=float, nargs='+', default=[0.25, 0.5, 1.0],
+                        help='Faktor resize yang dibandingkan untuk deteksi + encoding.')
+    parser.add_argument('--profiles', nargs='+', default=['fast', 'balanced'],
+                        help='Profil deteksi yang dibandingkan (deteksi piramida + encoding potongan resolusi penuh).')
+    parser.add_argument('--workers', type=int, default=1, help='Jumlah worker pool inferensi.')
+    parser.add_argument('--output', help='Simpan hasil sebagai JSON.')
+    parser.add_argument('--compare', nargs=2, metavar=('BASE', 'BARU'), help='Bandingkan dua file hasil lalu keluar.')
+    args = parser.parse_args()
+
+    if args.compare:
+        compare_reports(*args.compare)
+        return
+
+    output = os.path.abspath(args.output) if args.output else None
+    images = load_images(os.path.abspath(args.images)) if args.images else generate_face_images(args.num_images)
+    workdir = tempfile.mkdtemp(prefix='faceapi-bench-')
+    flaskapp = prepare_app(workdir, args.workers)
+    client = flaskapp.app.test_client()
+
+    report = {
+        'meta': {
+            'git_revision': git_revision(),
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'opencv': cv2.__version__,
+            'cpu_count': os.cpu_count(),
+            'platform': platform.platform(),
+            'images': 'synthetic' if not args.images else args.images,
+            'num_images': len(images),
+            'args': {key: value for key, value in vars(args).items() if key != 'compare'},
+        },
+        'scales': [],
+        'profiles': [],
+        'sizes': [],
+    }
+
+    print(f"Direktori kerja: {workdir}")
+    print("Deteksi + encoding per faktor resize:")
+    report['scales'] = bench_scales(flaskapp, images, args.scales)
+    print("Deteksi + encoding per profil deteksi:")
+    report['profiles'] = bench_profiles(flaskapp, images, args.profiles)
+
+    try:
+        for size in args.sizes:
+            print(f"\n== Galeri {size} identitas")
+            ids, encodings, setup = populate_gallery(flaskapp, size)
+            print(f"  insert DB {setup['db_insert_seconds']} s, muat galeri {setup['gallery_load_seconds']} s")
+            entry = {'size': size, **setup, 'search': bench_search(flaskapp, encodings, args.search_queries), 'endpoints': {}}
+            print(f"  pencarian galeri p50 {entry['search']['gallery_search'].get('p50_ms')} ms, "
+                  f"1:1 p50 {entry['search']['verify_1to1'].get('p50_ms')} ms")
+
+            requests = endpoint_requests(ids, images, args.batch_size)
+            for name in args.endpoints:
+                result = bench_endpoint(client, requests[name], args.requests)
+                entry['endpoints'][name] = result
+                print(f"  {name:<16} {result['throughput_rps']:>8} req/s  p50 {result['latency'].get('p50_ms')} ms  "
+                      f"p95 {result['latency'].get('p95_ms')} ms  status {result['status']}")
+            report['sizes'].append(entry)
+    finally:
+        flaskapp.inference_pool.shutdown()
+
+    if output:
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nHasil disimpan ke {output}")
+
+
+if __name__ == '__main__':
+    main()
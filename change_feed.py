@@ -0,0 +1,89 @@
+# change_feed.py
+
+import threading
+import time
+
+# =============================================================================
+# PEMBACA LOG PERUBAHAN GALERI (PER PROSES)
+# =============================================================================
+class ChangeFeed:
+    """
+    Menyimpan posisi baca log perubahan (seq terakhir yang sudah diterapkan) untuk
+    satu proses dan mem-poll log paling sering sekali per `interval` detik.
+
+    Nomor seq dialokasikan saat insert, bukan saat commit, sehingga transaksi yang
+    lebih lambat bisa muncul dengan seq lebih kecil dari yang sudah dibaca. Seq
+    yang terlewat dicatat sebagai celah dan ikut ditanyakan pada poll berikutnya
+    sampai muncul atau melewati `gap_timeout` (mis. transaksi yang di-rollback).
+    """
+
+    def __init__(self, interval=1.0, gap_timeout=60.0, max_gaps=1000):
+        self.interval = interval
+        self.gap_timeout = gap_timeout
+        self.max_gaps = max_gaps
+        # None sampai posisi awal ditetapkan dengan `reset`
+        self.position = None
+        self._gaps = {}
+        self._next_poll = 0.0
+        self._lock = threading.Lock()
+        self.polls = 0
+        self.changes = 0
+        self.last_poll = None
+
+    def reset(self, position):
+        """Menetapkan posisi awal (seq terakhir yang sudah tercermin di galeri)."""
+        with self._lock:
+            self.position = position or 0
+            self._gaps.clear()
+            self._next_poll = 0.0
+
+    def due(self):
+        return time.monotonic() >= self._next_poll
+
+    def poll(self, fetch, apply, wait=False):
+        """
+        Membaca entri baru dengan `fetch(after, gaps)` yang mengembalikan list
+        (seq, face_id), lalu memanggil `apply(face_ids)` untuk identitas yang berubah.
+        Posisi baru disimpan setelah `apply` berhasil. Jika thread lain sedang
+        mem-poll, langsung kembali (atau menunggu lalu mem-poll jika `wait`).
+        Mengembalikan jumlah identitas yang diterapkan.
+        """
+        if not self._lock.acquire(blocking=wait):
+            return 0
+        try:
+            now = time.monotonic()
+            self._next_poll = now + self.interval
+            position = self.position or 0
+            rows = fetch(position, sorted(self._gaps))
+            face_ids = {face_id for _, face_id in rows}
+            if face_ids:
+                apply(face_ids)
+
+            for seq, _ in rows:
+                self._gaps.pop(seq, None)
+            expected = position + 1
+            for seq in sorted(seq for seq, _ in rows if seq > position):
+                if seq - expected <= self.max_gaps:
+                    self._gaps.update(dict.fromkeys(range(expected, seq), now))
+                expected = seq + 1
+            self.position = expected - 1
+            for seq, seen_at in list(self._gaps.items()):
+                if now - seen_at > self.gap_timeout:
+                    del self._gaps[seq]
+
+            self.polls += 1
+            self.changes += len(face_ids)
+            self.last_poll = time.time()
+            return len(face_ids)
+        finally:
+            self._lock.release()
+
+    def stats(self):
+        return {
+            'position': self.position,
+            'pending_gaps': len(self._gaps),
+            'interval_seconds': self.interval,
+            'polls': self.polls,
+            'changes_applied': self.changes,
+            'last_poll': self.last_poll,
+        }
@@ -0,0 +1,27 @@
+# change_log.py
+
+from sqlalchemy import func, or_
+
+from models import db, GalleryChange
+
+# =============================================================================
+# LOG PERUBAHAN ENROLLMENT (TABEL gallery_changes)
+# =============================================================================
+# Register / update / delete / template baru dicatat di sesi yang sama dengan
+# perubahannya. Setiap proses kedua aplikasi mem-poll log ini dengan
+# `ChangeFeed` (change_feed.py) untuk menerapkan perubahan dari proses lain.
+
+def record_gallery_change(face_id, op):
+    """Mencatat perubahan enrollment di sesi yang sama (ikut commit / rollback bersama perubahannya)."""
+    db.session.add(GalleryChange(face_id=face_id, op=op))
+
+def current_change_seq():
+    """Seq terakhir di log perubahan (0 jika log masih kosong)."""
+    return db.session.query(func.max(GalleryChange.id)).scalar() or 0
+
+def fetch_gallery_changes(after, gaps):
+    """Entri log (seq, face_id) setelah `after`, ditambah seq celah yang belum terlihat."""
+    condition = GalleryChange.id > after
+    if gaps:
+        condition = or_(condition, GalleryChange.id.in_(gaps))
+    return db.session.query(GalleryChange.id, GalleryChange.face_id).filter(condition).order_by(GalleryChange.id).all()
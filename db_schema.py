@@ -0,0 +1,69 @@
+# db_schema.py
+
+import logging
+import threading
+from sqlalchemy import inspect, text
+from models import db, RegisteredFace, FaceTemplate, GalleryChange
+from face_listing import ensure_id_member_index
+
+# =============================================================================
+# LANGKAH SKEMA IDEMPOTEN (DIPAKAI BERSAMA flaskapp & LivenessFlask)
+# =============================================================================
+# Kolom baru pada model tidak ditambahkan `db.create_all()` ke tabel yang sudah
+# ada, sehingga tabel lama dilengkapi di sini. Dijalankan sekali per proses, baik
+# dari blok __main__ / perintah CLI maupun sebelum request pertama di bawah
+# server WSGI (wsgi.py / flaskapp.wsgi yang tidak menjalankan blok __main__).
+
+def ensure_tables():
+    """
+    Membuat tabel yang belum ada: registered_faces, face_templates, dan log
+    perubahan gallery_changes yang ditulis setiap register / update / delete dan
+    di-poll setiap request di kedua aplikasi. Mengembalikan nama tabel yang dibuat.
+    """
+    existing = set(inspect(db.engine).get_table_names())
+    db.create_all()
+    created = [model.__tablename__ for model in (RegisteredFace, FaceTemplate, GalleryChange)
+               if model.__tablename__ not in existing]
+    if created:
+        logging.info(f"Tabel database dibuat: {', '.join(created)}")
+    return created
+
+def ensure_column(name):
+    """Menambahkan kolom `name` (sesuai model) pada tabel lama jika belum ada. True jika ditambahkan."""
+    table = RegisteredFace.__table__
+    columns = {column['name'] for column in inspect(db.engine).get_columns(table.name)}
+    if name in columns:
+        return False
+    column_type = table.c[name].type.compile(dialect=db.engine.dialect)
+    with db.engine.begin() as connection:
+        connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {name} {column_type} NULL'))
+    return True
+
+def ensure_encoding_bin_column():
+    return ensure_column('face_encoding_bin')
+
+_database_ready = False
+_database_lock = threading.Lock()
+
+def prepare_database():
+    """
+    Membuat tabel yang belum ada (`ensure_tables`) dan menambahkan kolom / index
+    yang dibutuhkan query (face_encoding_bin, updated_at untuk snapshot / replay
+    galeri, index id_member) pada tabel lama. Harus dipanggil di dalam app context.
+    Jika gagal, error dicatat dan dicoba lagi pada pemanggilan berikutnya.
+    """
+    global _database_ready
+    if _database_ready:
+        return
+    with _database_lock:
+        if _database_ready:
+            return
+        try:
+            ensure_tables()
+            ensure_encoding_bin_column()
+            ensure_column('updated_at')
+            ensure_id_member_index()
+        except Exception as e:
+            logging.error(f"Gagal menyiapkan skema database (kolom/index yang dibutuhkan belum ada): {e}")
+            raise
+        _database_ready = True
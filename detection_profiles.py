@@ -0,0 +1,172 @@
+# detection_profiles.py
+
+import json
+import threading
+
+import cv2
+
+# =============================================================================
+# PROFIL DETEKSI WAJAH (FAST / BALANCED / ACCURATE)
+# =============================================================================
+# Setiap profil menentukan model detektor ('hog' atau 'cnn'), jumlah upsample,
+# jitter encoding, model landmark encoder ('small' 5 titik / 'large' 68 titik),
+# dan dimensi maksimal gambar untuk deteksi. Deteksi berjalan pada salinan yang
+# diperkecil, sedangkan landmark + encoding dihitung pada potongan wajah resolusi
+# penuh (lihat `scale_location` dan `face_crop`). `expected_ms` adalah perkiraan
+# awal latensi deteksi + encoding, dipakai untuk memilih profil dari anggaran
+# latensi sampai latensi nyata profil tersebut sudah teramati.
+DEFAULT_PROFILES = {
+    'fast': {'model': 'hog', 'upsample': 0, 'jitters': 1, 'landmarks': 'small', 'max_dimension': 480, 'expected_ms': 40},
+    'balanced': {'model': 'hog', 'upsample': 1, 'jitters': 1, 'landmarks': 'small', 'max_dimension': 640, 'expected_ms': 120},
+    'accurate': {'model': 'cnn', 'upsample': 1, 'jitters': 3, 'landmarks': 'large', 'max_dimension': 1024, 'expected_ms': 1500},
+}
+
+
+class DetectionProfile:
+    """Parameter deteksi + encoding; objek sederhana agar bisa dikirim ke worker pool."""
+
+    def __init__(self, name, model='hog', upsample=1, jitters=1, landmarks='small', max_dimension=None, expected_ms=None):
+        if model not in ('hog', 'cnn'):
+            raise ValueError(f"Model deteksi '{model}' tidak dikenal (hog / cnn)")
+        if landmarks not in ('small', 'large'):
+            raise ValueError(f"Model landmark '{landmarks}' tidak dikenal (small / large)")
+        self.name = name
+        self.model = model
+        self.upsample = int(upsample)
+        self.jitters = int(jitters)
+        self.landmarks = landmarks
+        self.max_dimension = int(max_dimension) if max_dimension else None
+        self.expected_ms = float(expected_ms) if expected_ms is not None else None
+
+    def resize(self, image):
+        """Salinan untuk deteksi: sisi terpanjang <= max_dimension (tidak pernah memperbesar)."""
+        longest = max(image.shape[:2])
+        if not self.max_dimension or longest <= self.max_dimension:
+            return image
+        factor = self.max_dimension / longest
+        return cv2.resize(image, (0, 0), fx=factor, fy=factor, interpolation=cv2.INTER_AREA)
+
+    @property
+    def cache_tag(self):
+        # Encoding hasil profil berbeda tidak boleh tertukar di cache hasil
+        return f'{self.model}-u{self.upsample}-j{self.jitters}-{self.landmarks}-d{self.max_dimension or 0}-crop'
+
+    def to_dict(self):
+        return {
+            'model': self.model,
+            'upsample': self.upsample,
+            'jitters': self.jitters,
+            'landmarks': self.landmarks,
+            'max_dimension': self.max_dimension,
+            'expected_ms': self.expected_ms,
+        }
+
+
+def scale_location(location, factor, shape):
+    """Memetakan kotak (top, right, bottom, left) dari gambar deteksi ke gambar asli berukuran `shape`."""
+    top, right, bottom, left = location
+    height, width = shape[:2]
+    return (max(int(round(top * factor)), 0), min(int(round(right * factor)), width),
+            min(int(round(bottom * factor)), height), max(int(round(left * factor)), 0))
+
+
+def face_crop(image, location, margin=0.25):
+    """
+    Potongan ketat di sekitar kotak wajah (ditambah `margin` x ukuran kotak agar
+    landmark di tepi wajah tetap masuk). Mengembalikan (potongan, kotak relatif
+    terhadap potongan); potongan berupa view tanpa salinan.
+    """
+    top, right, bottom, left = location
+    height, width = image.shape[:2]
+    pad_y, pad_x = int((bottom - top) * margin), int((right - left) * margin)
+    y0, x0 = max(top - pad_y, 0), max(left - pad_x, 0)
+    y1, x1 = min(bottom + pad_y, height), min(right + pad_x, width)
+    return image[y0:y1, x0:x1], (top - y0, right - x0, bottom - y0, left - x0)
+
+
+def locate_faces(image, profile):
+    """
+    Tahap deteksi piramida: kotak wajah dicari pada salinan yang diperkecil sesuai
+    profil (waktu deteksi terbatas berapa pun ukuran upload), lalu dipetakan
+    kembali ke koordinat gambar resolusi penuh. face_recognition diimpor saat
+    dipanggil (di worker inferensi), bukan saat modul ini diimpor.
+    """
+    import face_recognition
+    small_image = profile.resize(image)
+    factor = image.shape[1] / small_image.shape[1]
+    rgb_small = cv2.cvtColor(small_image, cv2.COLOR_BGR2RGB)
+    locations = face_recognition.face_locations(rgb_small, number_of_times_to_upsample=profile.upsample, model=profile.model)
+    return [scale_location(location, factor, image.shape) for location in locations]
+
+
+def load_profiles(overrides=None):
+    """
+    Profil bawaan, ditimpa/ditambah dari `overrides` (JSON string atau dict
+    {nama: {parameter: nilai}}), mis. '{"fast": {"max_dimension": 320}}'.
+    """
+    if isinstance(overrides, str):
+        overrides = json.loads(overrides) if overrides.strip() else {}
+    specs = {name: dict(spec) for name, spec in DEFAULT_PROFILES.items()}
+    for name, spec in (overrides or {}).items():
+        specs.setdefault(name, {}).update(spec)
+    return {name: DetectionProfile(name, **spec) for name, spec in specs.items()}
+
+
+class ProfileSelector:
+    """
+    Memilih profil per request: nama eksplisit, atau profil paling akurat yang
+    perkiraan latensinya masih di dalam anggaran, atau profil default endpoint.
+    Latensi nyata tiap profil dicatat sebagai rata-rata bergerak eksponensial.
+    Profil diurutkan dari tercepat ke paling akurat menurut `expected_ms`.
+    """
+
+    def __init__(self, profiles, default='balanced', alpha=0.2):
+        self.profiles = profiles
+        self.alpha = alpha
+        self._observed = {}
+        self._counts = {}
+        self._lock = threading.Lock()
+        self.default = self.get(default)
+        self._ordered = sorted(profiles.values(), key=lambda p: (p.expected_ms is None, p.expected_ms or 0))
+
+    def get(self, name):
+        profile = self.profiles.get(name)
+        if profile is None:
+            raise ValueError(f"Profil deteksi '{name}' tidak dikenal (pilihan: {', '.join(sorted(self.profiles))})")
+        return profile
+
+    def estimate_ms(self, profile):
+        observed = self._observed.get(profile.name)
+        return observed if observed is not None else profile.expected_ms
+
+    def choose(self, name=None, budget_ms=None, default=None):
+        """
+        `name` eksplisit selalu dipakai. Jika hanya `budget_ms` yang diisi, dipilih
+        profil paling akurat dengan perkiraan latensi <= anggaran (profil tercepat
+        jika tidak ada yang muat). Selain itu profil `default` (nama) atau default selector.
+        """
+        if name:
+            return self.get(name)
+        if budget_ms is not None:
+            if budget_ms <= 0:
+                raise ValueError('latency_budget_ms harus lebih dari 0')
+            fitting = [p for p in self._ordered if (self.estimate_ms(p) or 0) <= budget_ms]
+            return fitting[-1] if fitting else self._ordered[0]
+        return self.get(default) if default else self.default
+
+    def observe(self, profile, seconds):
+        """Mencatat latensi deteksi + encoding yang teramati untuk `profile`."""
+        ms = seconds * 1000.0
+        with self._lock:
+            previous = self._observed.get(profile.name)
+            self._observed[profile.name] = ms if previous is None else previous + self.alpha * (ms - previous)
+            self._counts[profile.name] = self._counts.get(profile.name, 0) + 1
+
+    def stats(self):
+        return {
+            'default': self.default.name,
+            'profiles': {
+                p.name: {**p.to_dict(), 'observed_ms': self._observed.get(p.name), 'observations': self._counts.get(p.name, 0)}
+                for p in self._ordered
+            },
+        }
@@ -0,0 +1,49 @@
+# face_codec.py
+
+import json
+import numpy as np
+
+# =============================================================================
+# CODEC BINER UNTUK FACE ENCODING
+# =============================================================================
+# Format versi 1: 1 byte nomor versi diikuti 128 float32 little-endian
+# (total 513 byte per encoding, dibanding ~2.5 KB untuk teks JSON).
+ENCODING_DIM = 128
+CODEC_VERSION = 1
+
+_V1_DTYPE = np.dtype([('version', 'u1'), ('vector', '<f4', (ENCODING_DIM,))])
+V1_SIZE = _V1_DTYPE.itemsize
+
+
+def encode_encoding(encoding):
+    """Mengubah encoding (list / ndarray 128 elemen) menjadi blob biner versi terbaru."""
+    record = np.zeros(1, dtype=_V1_DTYPE)
+    record['version'] = CODEC_VERSION
+    record['vector'][0] = np.asarray(encoding, dtype=np.float32).reshape(ENCODING_DIM)
+    return record.tobytes()
+
+
+def decode_encoding(blob):
+    """Mengubah satu blob biner menjadi ndarray float32 berukuran (128,)."""
+    return decode_many([blob])[0]
+
+
+def decode_many(blobs):
+    """
+    Mengubah banyak blob sekaligus menjadi matriks float32 (N, 128) dengan satu
+    kali konversi buffer ke ndarray. Semua blob harus berversi dan berukuran valid.
+    """
+    if not blobs:
+        return np.empty((0, ENCODING_DIM), dtype=np.float32)
+    buffer = b''.join(bytes(blob) for blob in blobs)
+    if len(buffer) != V1_SIZE * len(blobs):
+        raise ValueError('Ukuran blob encoding tidak valid')
+    records = np.frombuffer(buffer, dtype=_V1_DTYPE)
+    if np.any(records['version'] != CODEC_VERSION):
+        raise ValueError('Versi codec encoding tidak dikenali')
+    return np.ascontiguousarray(records['vector'], dtype=np.float32)
+
+
+def decode_json(text):
+    """Fallback untuk format lama: teks JSON berisi list 128 float."""
+    return np.asarray(json.loads(text), dtype=np.float32).reshape(ENCODING_DIM)
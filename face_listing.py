@@ -0,0 +1,79 @@
+# face_listing.py
+
+import json
+
+from sqlalchemy import inspect
+
+from models import db, RegisteredFace
+
+# =============================================================================
+# DAFTAR WAJAH (TANPA KOLOM ENCODING)
+# =============================================================================
+# Daftar hanya membaca kolom ringan; kolom encoding (teks JSON lama maupun blob
+# biner) tidak pernah ikut dimuat, berapa pun ukuran galeri.
+LIST_COLUMNS = (RegisteredFace.id, RegisteredFace.nama, RegisteredFace.id_member, RegisteredFace.url_face_img)
+
+
+def face_summary(row):
+    return {'id': row.id, 'nama': row.nama, 'id_member': row.id_member, 'url_face_img': row.url_face_img}
+
+
+def listing_query(columns=LIST_COLUMNS, id_member=None, after_id=None):
+    """Query kolom `columns` terurut id, dengan filter member dan kursor keyset (id > after_id)."""
+    query = db.session.query(*columns)
+    if id_member is not None:
+        query = query.filter(RegisteredFace.id_member == id_member)
+    if after_id is not None:
+        query = query.filter(RegisteredFace.id > after_id)
+    return query.order_by(RegisteredFace.id)
+
+
+def fetch_page(id_member=None, cursor=None, limit=100):
+    """
+    Mengambil satu halaman daftar wajah setelah `cursor` (id terakhir halaman
+    sebelumnya). Mengembalikan (rows, next_cursor); next_cursor None di halaman terakhir.
+    """
+    rows = listing_query(id_member=id_member, after_id=cursor).limit(limit + 1).all()
+    if len(rows) > limit:
+        return rows[:limit], rows[limit - 1].id
+    return rows, None
+
+
+def iter_face_chunks(columns=LIST_COLUMNS, id_member=None, chunk_size=1000):
+    """Seluruh baris dalam potongan keyset berukuran `chunk_size`; memori tetap kecil untuk tabel besar."""
+    cursor = None
+    while True:
+        rows = listing_query(columns, id_member, cursor).limit(chunk_size).all()
+        if rows:
+            yield rows
+        if len(rows) < chunk_size:
+            return
+        cursor = rows[-1].id
+
+
+def iter_faces(columns=LIST_COLUMNS, id_member=None, chunk_size=1000):
+    for rows in iter_face_chunks(columns, id_member, chunk_size):
+        yield from rows
+
+
+def stream_faces_json(id_member=None, chunk_size=1000):
+    """Generator JSON `{"registered_faces": [...]}` untuk ekspor penuh yang dikirim bertahap."""
+    yield '{"registered_faces": ['
+    separator = ''
+    for rows in iter_face_chunks(id_member=id_member, chunk_size=chunk_size):
+        yield separator + ','.join(json.dumps(face_summary(row)) for row in rows)
+        separator = ','
+    yield ']}'
+
+
+def ensure_id_member_index():
+    """Membuat index `id_member` pada tabel lama (dibuat sebelum index ada). True jika dibuat."""
+    table = RegisteredFace.__table__
+    existing = {tuple(index['column_names']) for index in inspect(db.engine).get_indexes(table.name)}
+    if ('id_member',) in existing:
+        return False
+    for index in table.indexes:
+        if [column.name for column in index.columns] == ['id_member']:
+            index.create(bind=db.engine)
+            return True
+    return False
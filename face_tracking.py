@@ -0,0 +1,127 @@
+# face_tracking.py
+
+import itertools
+
+# =============================================================================
+# PELACAKAN WAJAH ANTAR FRAME (OVERLAP KOTAK)
+# =============================================================================
+# Wajah di frame berikutnya dicocokkan ke track yang ada berdasarkan IoU kotak
+# (top, right, bottom, left). Encoding hanya dihitung ulang untuk track baru,
+# track yang kotaknya bergeser jauh (IoU di bawah `reencode_iou`), atau setelah
+# `reencode_every` frame; selebihnya identitas track dipakai ulang. Kedipan
+# (EAR turun di bawah threshold lalu naik lagi) diakumulasi per track untuk
+# liveness, menggantikan pemeriksaan mata terbuka satu frame.
+
+
+def box_iou(a, b):
+    """Intersection-over-union dua kotak (top, right, bottom, left)."""
+    top, bottom = max(a[0], b[0]), min(a[2], b[2])
+    left, right = max(a[3], b[3]), min(a[1], b[1])
+    if bottom <= top or right <= left:
+        return 0.0
+    intersection = (bottom - top) * (right - left)
+    area_a = (a[2] - a[0]) * (a[1] - a[3])
+    area_b = (b[2] - b[0]) * (b[1] - b[3])
+    return intersection / float(area_a + area_b - intersection)
+
+
+class FaceTrack:
+    """Satu wajah yang diikuti antar frame: kotak terakhir, encoding terakhir, dan status kedipan."""
+
+    def __init__(self, track_id, box):
+        self.id = track_id
+        self.box = tuple(box)
+        # IoU kotak terhadap frame sebelumnya (0 untuk track baru)
+        self.confidence = 0.0
+        self.encoding = None
+        self.distance = None
+        self.frames = 0
+        self.misses = 0
+        self.frames_since_encode = 0
+        self.ear = None
+        self.blinks = 0
+        self._closed_frames = 0
+
+    def observe_ear(self, ear, threshold, min_closed_frames=1):
+        """Mencatat EAR frame ini; satu kedipan = >= `min_closed_frames` frame tertutup lalu terbuka lagi."""
+        if ear is None:
+            return
+        self.ear = ear
+        if ear < threshold:
+            self._closed_frames += 1
+            return
+        if self._closed_frames >= min_closed_frames:
+            self.blinks += 1
+        self._closed_frames = 0
+
+    def set_encoding(self, encoding, distance=None):
+        self.encoding = encoding
+        self.distance = distance
+        self.frames_since_encode = 0
+
+
+class FaceTracker:
+    """
+    Pelacak IoU sederhana per stream (tidak thread-safe; satu instance per request).
+    `update` dipanggil sekali per frame dengan daftar deteksi ({'location', ...}).
+    """
+
+    def __init__(self, iou_threshold=0.3, reencode_iou=0.6, reencode_every=30, max_misses=5):
+        self.iou_threshold = iou_threshold
+        self.reencode_iou = reencode_iou
+        self.reencode_every = reencode_every
+        self.max_misses = max_misses
+        self.tracks = []
+        self._ids = itertools.count(1)
+
+    def stable_boxes(self):
+        """
+        Kotak track yang encoding-nya masih bisa dipakai ulang. Deteksi baru yang
+        overlap-nya dengan salah satu kotak ini >= `reencode_iou` tidak perlu di-encode.
+        """
+        return [track.box for track in self.tracks
+                if track.misses == 0 and track.encoding is not None
+                and not (self.reencode_every and track.frames_since_encode + 1 >= self.reencode_every)]
+
+    def update(self, detections):
+        """
+        Mencocokkan deteksi frame ini ke track (greedy, IoU terbesar dulu), membuat
+        track baru untuk deteksi yang tidak cocok, dan membuang track yang hilang
+        lebih dari `max_misses` frame. Mengembalikan list (track, deteksi).
+        """
+        pairs = sorted(
+            ((box_iou(track.box, detection['location']), t, d)
+             for t, track in enumerate(self.tracks)
+             for d, detection in enumerate(detections)),
+            reverse=True
+        )
+        matched_tracks, matched = set(), {}
+        for iou, t, d in pairs:
+            if iou < self.iou_threshold:
+                break
+            if t in matched_tracks or d in matched:
+                continue
+            matched_tracks.add(t)
+            matched[d] = (t, iou)
+
+        results = []
+        for d, detection in enumerate(detections):
+            if d in matched:
+                t, iou = matched[d]
+                track = self.tracks[t]
+                track.confidence = iou
+                track.misses = 0
+                track.frames_since_encode += 1
+            else:
+                track = FaceTrack(next(self._ids), detection['location'])
+                self.tracks.append(track)
+            track.box = tuple(detection['location'])
+            track.frames += 1
+            results.append((track, detection))
+
+        seen = {id(track) for track, _ in results}
+        for track in self.tracks:
+            if id(track) not in seen:
+                track.misses += 1
+        self.tracks = [track for track in self.tracks if track.misses <= self.max_misses]
+        return results
@@ -0,0 +1,87 @@
+# frame_stream.py
+
+import re
+
+# =============================================================================
+# PEMBACA FRAME DARI BODY MULTIPART (MJPEG) SECARA BERTAHAP
+# =============================================================================
+# Kamera / klien mengirim frame sebagai body multipart/x-mixed-replace (MJPEG),
+# biasanya dengan Transfer-Encoding: chunked. Body dibaca per potongan dan setiap
+# part dikembalikan segera setelah boundary berikutnya terlihat, sehingga frame
+# bisa diproses selagi frame selanjutnya masih dikirim.
+
+
+def multipart_boundary(content_type):
+    """Boundary dari header Content-Type multipart (bytes), atau None jika tidak ada."""
+    for param in (content_type or '').split(';')[1:]:
+        key, _, value = param.strip().partition('=')
+        if key.lower() == 'boundary' and value:
+            return value.strip('"').encode('latin-1')
+    return None
+
+
+# Baris header part yang sebenarnya ("Nama-Header: nilai"); body JPEG diawali
+# byte 0xFF sehingga tidak pernah cocok
+_HEADER_LINE = re.compile(rb'^[A-Za-z0-9-]+:')
+
+
+def _part_body(part):
+    # Part: CRLF, header (opsional), baris kosong, body, CRLF sebelum boundary berikutnya
+    if part.startswith(b'\r\n'):
+        part = part[2:]
+    if part.startswith(b'\r\n'):
+        # Tanpa header: baris kosong langsung diikuti body
+        part = part[2:]
+    elif _HEADER_LINE.match(part):
+        header_end = part.find(b'\r\n\r\n')
+        if header_end >= 0:
+            part = part[header_end + 4:]
+    if part.endswith(b'\r\n'):
+        part = part[:-2]
+    return part
+
+
+def iter_frames(stream, boundary, max_frame_bytes=4 * 1024 * 1024, chunk_size=64 * 1024):
+    """
+    Generator byte frame (body tiap part) dari `stream` multipart. Berhenti pada
+    boundary penutup atau akhir stream. Melempar ValueError jika satu part
+    melebihi `max_frame_bytes`.
+    """
+    delimiter = b'--' + boundary
+    buffer = bytearray()
+    started = False
+    search_from = 0
+    while True:
+        index = buffer.find(delimiter, search_from)
+        if index > max_frame_bytes + 1024:
+            raise ValueError(f'Frame melebihi {max_frame_bytes} byte')
+        if index >= 0:
+            if started:
+                body = _part_body(bytes(buffer[:index]))
+                if body:
+                    yield body
+            started = True
+            del buffer[:index + len(delimiter)]
+            search_from = 0
+            while len(buffer) < 2:
+                chunk = stream.read(chunk_size)
+                if not chunk:
+                    break
+                buffer += chunk
+            if buffer[:2] == b'--':
+                return
+            continue
+
+        if len(buffer) > max_frame_bytes + len(delimiter) + 1024:
+            raise ValueError(f'Frame melebihi {max_frame_bytes} byte')
+        search_from = max(0, len(buffer) - len(delimiter))
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        buffer += chunk
+
+    # Stream berakhir tanpa boundary penutup: part terakhir tetap diproses
+    if started:
+        body = _part_body(bytes(buffer))
+        if body:
+            yield body
@@ -0,0 +1,770 @@
+# gallery.py
+
+import copy
+import logging
+import threading
+import numpy as np
+
+AGGREGATIONS = ('min', 'mean')
+
+
+def template_key(face_id, template_id=0):
+    """
+    Kunci unik satu baris (template) galeri: template utama (encoding di
+    `registered_faces`) memakai ID wajah, template tambahan memakai -ID template.
+    """
+    return -int(template_id) if template_id else int(face_id)
+
+
+def aggregate_distances(distances, aggregate='min'):
+    """Menggabungkan jarak ke beberapa template satu identitas menjadi satu skor."""
+    distances = np.asarray(distances, dtype=np.float32).reshape(-1)
+    return float(distances.mean() if aggregate == 'mean' else distances.min())
+
+
+# =============================================================================
+# INDEKS GALERI WAJAH DI MEMORI
+# =============================================================================
+class GalleryIndex:
+    """
+    Menyimpan seluruh template encoding wajah terdaftar dalam satu matriks NumPy
+    yang kontigu beserta array pemilik (ID wajah) per baris, sehingga satu
+    pencarian cukup dengan satu operasi jarak tervektorisasi. Satu identitas
+    bisa memiliki beberapa template; jaraknya digabung dengan `aggregate`
+    ('min' atau 'mean'). Perubahan data diterapkan secara inkremental
+    (upsert / remove) tanpa perlu membangun ulang seluruh indeks.
+    """
+
+    def __init__(self, dim=128, initial_capacity=1024, aggregate='min'):
+        if aggregate not in AGGREGATIONS:
+            raise ValueError(f"aggregate harus salah satu dari {AGGREGATIONS}")
+        self.dim = dim
+        self.aggregate = aggregate
+        self.initial_capacity = initial_capacity
+        self._lock = threading.RLock()
+        self._allocate(initial_capacity)
+        self._pending = {}
+        self.loaded = False
+        # Indeks ANN opsional (mis. ann.IVFPQIndex); None berarti pencarian eksak
+        self.ann = None
+        self.ann_training = False
+
+    def _allocate(self, capacity):
+        # Per baris: encoding, |g|^2, pemilik, kunci template, dan slot identitas
+        self._encodings = np.empty((capacity, self.dim), dtype=np.float32)
+        self._sq_norms = np.empty(capacity, dtype=np.float32)
+        self._ids = np.empty(capacity, dtype=np.int64)
+        self._keys = np.empty(capacity, dtype=np.int64)
+        self._slots = np.empty(capacity, dtype=np.int64)
+        # Per identitas: slot padat 0..n-1 untuk agregasi dengan bincount
+        self._slot_ids = np.empty(capacity, dtype=np.int64)
+        self._slot_of = {}
+        self._keys_of = {}
+        self._row_of = {}
+        self._size = 0
+
+    def __len__(self):
+        """Jumlah identitas di galeri."""
+        return len(self._slot_of)
+
+    def __contains__(self, face_id):
+        return face_id in self._slot_of
+
+    @property
+    def template_count(self):
+        """Jumlah seluruh template (baris matriks) di galeri."""
+        return self._size
+
+    @property
+    def memory_bytes(self):
+        """Memori yang dialokasikan array NumPy indeks (byte, termasuk kapasitas cadangan)."""
+        return sum(getattr(self, name).nbytes for name in ('_encodings', '_sq_norms', '_ids', '_keys', '_slots', '_slot_ids'))
+
+    # -------------------------------------------------------------------------
+    # Pembangunan indeks
+    # -------------------------------------------------------------------------
+    def build(self, ids, encodings, template_ids=None):
+        """
+        Membangun ulang indeks dari daftar ID wajah dan encoding (dipakai saat
+        startup). `template_ids` (opsional, sejajar dengan `ids`) berisi ID template
+        tambahan, atau 0 untuk template utama.
+        """
+        encodings = np.asarray(encodings, dtype=np.float32).reshape(-1, self.dim)
+        ids = np.asarray(ids, dtype=np.int64).reshape(-1)
+        if template_ids is None:
+            template_ids = np.zeros(len(ids), dtype=np.int64)
+        with self._lock:
+            n = len(ids)
+            self._allocate(max(n, self.initial_capacity))
+            self._encodings[:n] = encodings
+            self._sq_norms[:n] = np.einsum('ij,ij->i', encodings, encodings)
+            self._ids[:n] = ids
+            for row, (face_id, template_id) in enumerate(zip(ids.tolist(), np.asarray(template_ids).tolist())):
+                key = template_key(face_id, template_id)
+                self._keys[row] = key
+                self._row_of[key] = row
+                self._keys_of.setdefault(face_id, []).append(key)
+                slot = self._slot_of.get(face_id)
+                if slot is None:
+                    slot = self._slot_of[face_id] = len(self._slot_of)
+                    self._slot_ids[slot] = face_id
+                self._slots[row] = slot
+            self._size = n
+            if self.ann is not None:
+                self.train_ann()
+            self.loaded = True
+
+    def export_arrays(self):
+        """Salinan array indeks yang terisi (untuk snapshot), lihat `adopt`."""
+        with self._lock:
+            n, slots = self._size, len(self._slot_of)
+            return {
+                'encodings': self._encodings[:n].copy(), 'sq_norms': self._sq_norms[:n].copy(),
+                'ids': self._ids[:n].copy(), 'keys': self._keys[:n].copy(),
+                'slots': self._slots[:n].copy(), 'slot_ids': self._slot_ids[:slots].copy(),
+            }
+
+    def adopt(self, arrays, size, slots):
+        """
+        Memakai array yang sudah ada (mis. view memory-mapped dari snapshot) sebagai
+        penyimpanan indeks tanpa menyalinnya. Setiap array harus sepanjang kapasitas
+        yang sama; `size` baris dan `slots` identitas pertama berisi data. Hanya
+        kamus pencarian (kunci -> baris, identitas -> slot) yang dibangun ulang.
+        """
+        keys = arrays['keys'][:size].tolist()
+        ids = arrays['ids'][:size].tolist()
+        with self._lock:
+            for name in ('encodings', 'sq_norms', 'ids', 'keys', 'slots', 'slot_ids'):
+                setattr(self, f'_{name}', arrays[name])
+            self._size = size
+            self._row_of = dict(zip(keys, range(size)))
+            self._slot_of = dict(zip(arrays['slot_ids'][:slots].tolist(), range(slots)))
+            if size == slots:
+                self._keys_of = {face_id: [key] for key, face_id in zip(keys, ids)}
+            else:
+                self._keys_of = {}
+                for key, face_id in zip(keys, ids):
+                    self._keys_of.setdefault(face_id, []).append(key)
+            if self.ann is not None:
+                self.train_ann()
+            self.loaded = True
+
+    def train_ann(self):
+        """
+        Melatih ulang indeks ANN dari seluruh isi galeri. Pelatihan dilakukan pada
+        salinan indeks ANN dengan sampel encoding saat itu, lalu salinan dipasang
+        beserta seluruh template terbaru; selama pelatihan pencarian tetap memakai
+        indeks lama (atau eksak). Jika galeri masih terlalu kecil, ANN tidak dipakai.
+        """
+        with self._lock:
+            n = self._size
+            if n < self.ann.min_train_size:
+                logging.info(f"Galeri berisi {n} template (< {self.ann.min_train_size}), pencarian ANN belum diaktifkan")
+                self.ann.trained = False
+                return False
+            ann = copy.copy(self.ann)
+            sample = self._encodings[:n].copy()
+        ann.train(sample)
+        with self._lock:
+            n = self._size
+            ann.add(self._keys[:n], self._encodings[:n])
+            self.ann = ann
+        logging.info(f"Indeks ANN dilatih untuk {n} template")
+        return True
+
+    def _maybe_train_ann(self):
+        # Dipanggil dengan lock dipegang setelah template baru ditambahkan: partisi
+        # yang belum punya ANN terlatih (dibuat setelah startup, atau masih kecil
+        # saat dimuat) dilatih di thread latar begitu mencapai `min_train_size`
+        if (self.ann is None or self.ann.trained or self.ann_training
+                or self._size < self.ann.min_train_size):
+            return
+        self.ann_training = True
+        logging.info(f"Galeri mencapai {self._size} template, melatih indeks ANN di latar")
+        threading.Thread(target=self._train_ann_background, name='ann-train', daemon=True).start()
+
+    def _train_ann_background(self):
+        try:
+            self.train_ann()
+        except Exception as e:
+            logging.warning(f"Pelatihan indeks ANN gagal, pencarian tetap eksak: {e}")
+        finally:
+            self.ann_training = False
+
+    def ensure_loaded(self, loader):
+        """
+        Memuat indeks satu kali dengan `loader()` yang mengembalikan
+        (ids, encodings) atau (ids, encodings, template_ids).
+        Aman dipanggil dari banyak thread; hanya thread pertama yang memuat.
+        """
+        if self.loaded:
+            return
+        with self._lock:
+            if self.loaded:
+                return
+            self.build(*loader())
+
+    def _grow(self):
+        capacity = self._encodings.shape[0] * 2
+        n, slots = self._size, len(self._slot_of)
+        arrays = []
+        for name in ('_encodings', '_sq_norms', '_ids', '_keys', '_slots', '_slot_ids'):
+            old = getattr(self, name)
+            new = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+            used = slots if name == '_slot_ids' else n
+            new[:used] = old[:used]
+            arrays.append((name, new))
+        for name, new in arrays:
+            setattr(self, name, new)
+
+    # -------------------------------------------------------------------------
+    # Perubahan inkremental
+    # -------------------------------------------------------------------------
+    def upsert(self, face_id, encoding, template_id=0):
+        """
+        Menambahkan template baru, atau mengganti template jika sudah ada.
+        Tanpa `template_id` yang diganti adalah template utama identitas.
+        """
+        encoding = np.asarray(encoding, dtype=np.float32).reshape(self.dim)
+        face_id = int(face_id)
+        key = template_key(face_id, template_id)
+        with self._lock:
+            row = self._row_of.get(key)
+            if row is None:
+                if self._size == self._encodings.shape[0]:
+                    self._grow()
+                row = self._size
+                self._size += 1
+                self._row_of[key] = row
+                self._ids[row] = face_id
+                self._keys[row] = key
+                slot = self._slot_of.get(face_id)
+                if slot is None:
+                    slot = self._slot_of[face_id] = len(self._slot_of)
+                    self._slot_ids[slot] = face_id
+                self._slots[row] = slot
+                self._keys_of.setdefault(face_id, []).append(key)
+            self._encodings[row] = encoding
+            self._sq_norms[row] = float(np.dot(encoding, encoding))
+            if self.ann is not None and self.ann.trained:
+                self.ann.add([key], encoding)
+            else:
+                self._maybe_train_ann()
+
+    def remove(self, face_id):
+        """Menghapus identitas beserta seluruh templatenya. True jika ada yang dihapus."""
+        face_id = int(face_id)
+        with self._lock:
+            keys = list(self._keys_of.get(face_id, ()))
+            for key in keys:
+                self._remove_key(key)
+            return bool(keys)
+
+    def remove_template(self, face_id, template_id):
+        """Menghapus satu template tambahan. True jika template ada."""
+        with self._lock:
+            return self._remove_key(template_key(face_id, template_id))
+
+    def _remove_key(self, key):
+        # Baris dihapus dengan memindahkan baris terakhir ke posisinya; slot
+        # identitas yang kehilangan template terakhir diisi slot terakhir.
+        row = self._row_of.pop(key, None)
+        if row is None:
+            return False
+        face_id = int(self._ids[row])
+        if self.ann is not None and self.ann.trained:
+            self.ann.remove(key)
+        keys = self._keys_of[face_id]
+        keys.remove(key)
+        if not keys:
+            del self._keys_of[face_id]
+            slot = self._slot_of.pop(face_id)
+            last_slot = len(self._slot_of)
+            if slot != last_slot:
+                moved_face = int(self._slot_ids[last_slot])
+                self._slot_ids[slot] = moved_face
+                self._slot_of[moved_face] = slot
+                for moved_key in self._keys_of[moved_face]:
+                    self._slots[self._row_of[moved_key]] = slot
+        last = self._size - 1
+        if row != last:
+            moved_key = int(self._keys[last])
+            self._encodings[row] = self._encodings[last]
+            self._sq_norms[row] = self._sq_norms[last]
+            self._ids[row] = self._ids[last]
+            self._keys[row] = moved_key
+            self._slots[row] = self._slots[last]
+            self._row_of[moved_key] = row
+        self._size = last
+        return True
+
+    # -------------------------------------------------------------------------
+    # Pencarian
+    # -------------------------------------------------------------------------
+    def _sq_distances(self, query):
+        # |g - q|^2 = |g|^2 - 2 g.q + |q|^2, cukup satu perkalian matriks-vektor.
+        # Dipanggil dengan lock sudah dipegang.
+        n = self._size
+        sq = self._encodings[:n] @ query
+        sq *= -2.0
+        sq += self._sq_norms[:n]
+        sq += np.dot(query, query)
+        np.maximum(sq, 0.0, out=sq)
+        return sq
+
+    def _aggregate(self, dists, aggregate=None):
+        # Menggabungkan jarak per template (baris) menjadi jarak per identitas.
+        # Dipanggil dengan lock sudah dipegang; `dists` berbentuk (n,) atau (q, n).
+        n, slots = self._size, len(self._slot_of)
+        if n == slots:
+            # Satu template per identitas: tidak ada yang perlu digabung
+            return self._ids[:n].copy(), dists
+        aggregate = aggregate or self.aggregate
+        row_slots = self._slots[:n]
+        if aggregate == 'mean':
+            counts = np.bincount(row_slots, minlength=slots)
+            if dists.ndim == 1:
+                agg = np.bincount(row_slots, weights=dists, minlength=slots) / counts
+            else:
+                agg = np.stack([np.bincount(row_slots, weights=row, minlength=slots) for row in dists]) / counts
+        else:
+            agg = np.full(dists.shape[:-1] + (slots,), np.inf, dtype=dists.dtype)
+            if dists.ndim == 1:
+                np.minimum.at(agg, row_slots, dists)
+            else:
+                for q in range(len(dists)):
+                    np.minimum.at(agg[q], row_slots, dists[q])
+        return self._slot_ids[:slots].copy(), agg.astype(np.float32, copy=False)
+
+    def distances(self, encoding, aggregate=None):
+        """
+        Menghitung jarak euclidean encoding terhadap seluruh galeri; jarak ke
+        template milik identitas yang sama digabung. Mengembalikan (ids, distances).
+        """
+        query = np.asarray(encoding, dtype=np.float32).reshape(self.dim)
+        with self._lock:
+            dists = np.sqrt(self._sq_distances(query))
+            return self._aggregate(dists, aggregate)
+
+    def _ann_distances(self, encoding, top_k):
+        # Kandidat dari ANN, lalu jarak eksak ke seluruh template milik identitas kandidat
+        query = np.asarray(encoding, dtype=np.float32).reshape(self.dim)
+        with self._lock:
+            keys = self.ann.candidates(query, rerank=max(self.ann.rerank, top_k))
+            owners = list(dict.fromkeys(int(self._ids[self._row_of[int(key)]]) for key in keys))
+            rows = [[self._row_of[key] for key in self._keys_of[face_id]] for face_id in owners]
+            flat = np.fromiter((row for group in rows for row in group), dtype=np.int64)
+            diff = self._encodings[flat] - query
+        dists = np.sqrt(np.einsum('ij,ij->i', diff, diff))
+        bounds = np.cumsum([0] + [len(group) for group in rows])
+        agg = [aggregate_distances(dists[start:end], self.aggregate) for start, end in zip(bounds[:-1], bounds[1:])]
+        return np.asarray(owners, dtype=np.int64), np.asarray(agg, dtype=np.float32)
+
+    def search(self, encoding, top_k=1, tolerance=None):
+        """
+        Mencari `top_k` wajah terdekat. Mengembalikan list (id, jarak) terurut
+        dari jarak terkecil; jika `tolerance` diisi, hanya yang jaraknya <= tolerance.
+        """
+        if self.ann is not None and self.ann.trained:
+            ids, dists = self._ann_distances(encoding, top_k)
+        else:
+            ids, dists = self.distances(encoding)
+        return _top_k(ids, dists, top_k, tolerance)
+
+    def search_many(self, encodings, top_k=1, tolerance=None):
+        """
+        Versi batch dari `search`: seluruh query dicocokkan terhadap galeri dengan
+        satu perkalian matriks (query x galeri). Mengembalikan satu list hasil per query.
+        """
+        queries = np.asarray(encodings, dtype=np.float32).reshape(-1, self.dim)
+        if len(queries) == 0:
+            return []
+        if self.ann is not None and self.ann.trained:
+            return [self.search(query, top_k=top_k, tolerance=tolerance) for query in queries]
+        with self._lock:
+            n = self._size
+            sq = queries @ self._encodings[:n].T
+            sq *= -2.0
+            sq += self._sq_norms[:n]
+            sq += np.einsum('ij,ij->i', queries, queries)[:, None]
+            np.maximum(sq, 0.0, out=sq)
+            ids, dists = self._aggregate(np.sqrt(sq, out=sq))
+        return [_top_k(ids, row, top_k, tolerance) for row in dists]
+
+    def get(self, face_id):
+        """Mengembalikan salinan template utama untuk `face_id`, atau None jika tidak ada."""
+        with self._lock:
+            row = self._row_of.get(template_key(face_id))
+            return None if row is None else self._encodings[row].copy()
+
+    def get_templates(self, face_id):
+        """Mengembalikan salinan seluruh template `face_id` (matriks k x dim), atau None."""
+        with self._lock:
+            keys = self._keys_of.get(int(face_id))
+            if not keys:
+                return None
+            return self._encodings[[self._row_of[key] for key in keys]]
+
+    def template_keys(self, face_id):
+        """Daftar kunci template (lihat `template_key`) milik `face_id`."""
+        with self._lock:
+            return list(self._keys_of.get(int(face_id), ()))
+
+    def best_match(self, encoding, tolerance=0.4):
+        """Mengembalikan (id, jarak) wajah terdekat dalam toleransi, atau None."""
+        matches = self.search(encoding, top_k=1, tolerance=tolerance)
+        return matches[0] if matches else None
+
+    # -------------------------------------------------------------------------
+    # Pemeriksaan duplikat saat registrasi
+    # -------------------------------------------------------------------------
+    def find_duplicates(self, encoding, tolerance=0.4, exclude_id=None):
+        """
+        Mengembalikan semua (id, jarak) yang jaraknya <= tolerance, terurut dari
+        yang terdekat. Identitas dianggap bentrok jika salah satu templatenya dekat.
+        Registrasi yang sedang berjalan (reservasi) ikut diperiksa.
+        """
+        query = np.asarray(encoding, dtype=np.float32).reshape(self.dim)
+        with self._lock:
+            sq = self._sq_distances(query)
+            hits = np.flatnonzero(sq <= tolerance * tolerance)
+            closest = {}
+            for i in hits:
+                face_id, distance = int(self._ids[i]), float(np.sqrt(sq[i]))
+                closest[face_id] = min(distance, closest.get(face_id, distance))
+            conflicts = list(closest.items())
+            for pending_id, pending_encoding in self._pending.items():
+                distance = float(np.linalg.norm(pending_encoding - query))
+                if distance <= tolerance:
+                    conflicts.append((pending_id, distance))
+        if exclude_id is not None:
+            conflicts = [c for c in conflicts if c[0] != exclude_id]
+        conflicts.sort(key=lambda c: c[1])
+        return conflicts
+
+    def reserve(self, face_id, encoding, tolerance=0.4):
+        """
+        Secara atomik memeriksa duplikat lalu mencadangkan encoding untuk `face_id`
+        agar registrasi paralel dengan wajah yang sama ikut terdeteksi sebagai duplikat.
+        Mengembalikan list konflik; jika kosong, reservasi berhasil dan wajib
+        dilepas dengan `release()` setelah commit (berhasil maupun gagal).
+        """
+        face_id = int(face_id)
+        query = np.asarray(encoding, dtype=np.float32).reshape(self.dim)
+        with self._lock:
+            if face_id in self._pending:
+                return [(face_id, 0.0)]
+            conflicts = self.find_duplicates(query, tolerance=tolerance)
+            if not conflicts:
+                self._pending[face_id] = query
+            return conflicts
+
+    def release(self, face_id):
+        """Melepas reservasi registrasi untuk `face_id`."""
+        with self._lock:
+            self._pending.pop(int(face_id), None)
+
+
+# =============================================================================
+# GALERI TERPARTISI (MIS. PER TENANT / ID_MEMBER)
+# =============================================================================
+class PartitionedGallery:
+    """
+    Galeri yang dipecah menjadi beberapa `GalleryIndex`, satu per kunci partisi
+    (mis. `id_member` tenant; identitas tanpa member masuk partisi None). Pencarian
+    dengan `partition` hanya memindai partisi tersebut; tanpa `partition` hasil
+    seluruh partisi digabung. Pemeriksaan duplikat dan reservasi registrasi tetap
+    berlaku lintas partisi.
+    """
+
+    def __init__(self, dim=128, aggregate='min', ann_factory=None, initial_capacity=64):
+        if aggregate not in AGGREGATIONS:
+            raise ValueError(f"aggregate harus salah satu dari {AGGREGATIONS}")
+        self.dim = dim
+        self.aggregate = aggregate
+        # Pembuat indeks ANN per partisi (mis. lambda: IVFPQIndex(...)); None = eksak
+        self.ann_factory = ann_factory
+        self.initial_capacity = initial_capacity
+        self._lock = threading.RLock()
+        self._partitions = {}
+        self._partition_of = {}
+        self._pending = {}
+        self.loaded = False
+
+    def __len__(self):
+        """Jumlah identitas di seluruh partisi."""
+        return len(self._partition_of)
+
+    def __contains__(self, face_id):
+        return face_id in self._partition_of
+
+    @property
+    def template_count(self):
+        """Jumlah seluruh template di semua partisi."""
+        with self._lock:
+            return sum(index.template_count for index in self._partitions.values())
+
+    def _new_partition(self):
+        index = GalleryIndex(self.dim, initial_capacity=self.initial_capacity, aggregate=self.aggregate)
+        if self.ann_factory is not None:
+            index.ann = self.ann_factory()
+        index.loaded = True
+        return index
+
+    def _partition(self, partition):
+        # Dipanggil dengan lock sudah dipegang
+        index = self._partitions.get(partition)
+        if index is None:
+            index = self._partitions[partition] = self._new_partition()
+        return index
+
+    def contents(self):
+        """
+        Salinan isi galeri: ({face_id: partisi}, {template_id: face_id}) untuk
+        template tambahan. Dipakai untuk membandingkan isi galeri dengan database.
+        """
+        with self._lock:
+            templates = {}
+            for index in self._partitions.values():
+                for key, row in index._row_of.items():
+                    if key < 0:
+                        templates[-key] = int(index._ids[row])
+            return dict(self._partition_of), templates
+
+    def partition_of(self, face_id):
+        """Kunci partisi tempat `face_id` berada (None juga untuk identitas yang tidak ada)."""
+        return self._partition_of.get(int(face_id))
+
+    # -------------------------------------------------------------------------
+    # Pembangunan indeks
+    # -------------------------------------------------------------------------
+    def build(self, ids, encodings, template_ids=None, partitions=None):
+        """
+        Membangun ulang seluruh partisi. `partitions` (opsional, sejajar dengan
+        `ids`) berisi kunci partisi tiap baris; tanpa itu semua masuk partisi None.
+        """
+        encodings = np.asarray(encodings, dtype=np.float32).reshape(-1, self.dim)
+        ids = np.asarray(ids, dtype=np.int64).reshape(-1)
+        template_ids = np.zeros(len(ids), dtype=np.int64) if template_ids is None else np.asarray(template_ids, dtype=np.int64)
+        rows = {}
+        for row, partition in enumerate([None] * len(ids) if partitions is None else partitions):
+            rows.setdefault(partition, []).append(row)
+        with self._lock:
+            self._partitions = {}
+            self._partition_of = {}
+            for partition, partition_rows in rows.items():
+                index = self._partitions[partition] = self._new_partition()
+                partition_rows = np.asarray(partition_rows, dtype=np.int64)
+                index.build(ids[partition_rows], encodings[partition_rows], template_ids[partition_rows])
+                self._partition_of.update(dict.fromkeys(ids[partition_rows].tolist(), partition))
+            self.loaded = True
+
+    def load_snapshot(self, snapshot):
+        """
+        Memuat seluruh partisi dari `GallerySnapshot` tanpa menyalin matriks encoding
+        (lihat `GalleryIndex.adopt`). `loaded` tidak diubah; pemanggil menandai
+        galeri siap setelah perubahan sesudah snapshot diterapkan.
+        """
+        with self._lock:
+            self._partitions = {}
+            self._partition_of = {}
+            for partition, arrays, size, slots in snapshot.partitions():
+                index = self._partitions[partition] = self._new_partition()
+                index.adopt(arrays, size, slots)
+                self._partition_of.update(dict.fromkeys(arrays['slot_ids'][:slots].tolist(), partition))
+
+    def export_partitions(self):
+        """List (kunci_partisi, arrays) untuk `gallery_snapshot.write_snapshot`."""
+        with self._lock:
+            return [(partition, index.export_arrays()) for partition, index in self._partitions.items()]
+
+    def train_ann(self):
+        """Melatih ulang indeks ANN setiap partisi (partisi kecil tetap eksak)."""
+        with self._lock:
+            return [index.train_ann() for index in self._partitions.values() if index.ann is not None]
+
+    def ensure_loaded(self, loader):
+        """
+        Memuat indeks satu kali dengan `loader()` yang mengembalikan
+        (ids, encodings[, template_ids[, partitions]]), atau None jika loader sudah
+        mengisi indeks sendiri (mis. lewat `load_snapshot`).
+        """
+        if self.loaded:
+            return
+        with self._lock:
+            if self.loaded:
+                return
+            loaded = loader()
+            if loaded is not None:
+                self.build(*loaded)
+            self.loaded = True
+
+    # -------------------------------------------------------------------------
+    # Perubahan inkremental
+    # -------------------------------------------------------------------------
+    def upsert(self, face_id, encoding, template_id=0, partition=None):
+        """
+        Menambahkan/mengganti template. Identitas baru masuk ke `partition`;
+        identitas yang sudah ada tetap di partisinya (gunakan `move` untuk pindah).
+        """
+        face_id = int(face_id)
+        with self._lock:
+            if face_id in self._partition_of:
+                partition = self._partition_of[face_id]
+            self._partition(partition).upsert(face_id, encoding, template_id)
+            self._partition_of[face_id] = partition
+
+    def move(self, face_id, partition):
+        """Memindahkan identitas beserta seluruh templatenya ke `partition`. True jika dipindah."""
+        face_id = int(face_id)
+        with self._lock:
+            current = self._partition_of.get(face_id)
+            if face_id not in self._partition_of or current == partition:
+                return False
+            source = self._partitions[current]
+            keys = source.template_keys(face_id)
+            templates = source.get_templates(face_id)
+            self.remove(face_id)
+            target = self._partition(partition)
+            for key, encoding in zip(keys, templates):
+                target.upsert(face_id, encoding, template_id=-key if key < 0 else 0)
+            self._partition_of[face_id] = partition
+            return True
+
+    def remove(self, face_id):
+        face_id = int(face_id)
+        with self._lock:
+            if face_id not in self._partition_of:
+                return False
+            partition = self._partition_of.pop(face_id)
+            index = self._partitions[partition]
+            index.remove(face_id)
+            if len(index) == 0:
+                del self._partitions[partition]
+            return True
+
+    def remove_template(self, face_id, template_id):
+        with self._lock:
+            index = self._partitions.get(self._partition_of.get(int(face_id), None))
+            if index is None or int(face_id) not in index:
+                return False
+            removed = index.remove_template(face_id, template_id)
+            if int(face_id) not in index:
+                partition = self._partition_of.pop(int(face_id))
+                if len(index) == 0:
+                    del self._partitions[partition]
+            return removed
+
+    # -------------------------------------------------------------------------
+    # Pencarian
+    # -------------------------------------------------------------------------
+    def _scope(self, partition):
+        # Partisi yang dipindai: satu partisi, atau seluruhnya jika `partition` None
+        with self._lock:
+            if partition is None:
+                return list(self._partitions.values())
+            index = self._partitions.get(partition)
+            return [index] if index is not None else []
+
+    def search(self, encoding, top_k=1, tolerance=None, partition=None):
+        """Seperti `GalleryIndex.search`; `partition` membatasi pencarian ke satu partisi."""
+        results = [index.search(encoding, top_k=top_k, tolerance=tolerance) for index in self._scope(partition)]
+        return _merge(results, top_k)
+
+    def search_many(self, encodings, top_k=1, tolerance=None, partition=None):
+        """Versi batch dari `search`: satu perkalian matriks per partisi yang dipindai."""
+        queries = np.asarray(encodings, dtype=np.float32).reshape(-1, self.dim)
+        if len(queries) == 0:
+            return []
+        per_partition = [index.search_many(queries, top_k=top_k, tolerance=tolerance) for index in self._scope(partition)]
+        return [_merge(results, top_k) for results in zip(*per_partition)] if per_partition else [[] for _ in queries]
+
+    def best_match(self, encoding, tolerance=0.4, partition=None):
+        matches = self.search(encoding, top_k=1, tolerance=tolerance, partition=partition)
+        return matches[0] if matches else None
+
+    def get(self, face_id):
+        index = self._partitions.get(self.partition_of(face_id))
+        return None if index is None else index.get(face_id)
+
+    def get_templates(self, face_id):
+        index = self._partitions.get(self.partition_of(face_id))
+        return None if index is None else index.get_templates(face_id)
+
+    def template_keys(self, face_id):
+        index = self._partitions.get(self.partition_of(face_id))
+        return [] if index is None else index.template_keys(face_id)
+
+    # -------------------------------------------------------------------------
+    # Pemeriksaan duplikat saat registrasi (lintas partisi)
+    # -------------------------------------------------------------------------
+    def find_duplicates(self, encoding, tolerance=0.4, exclude_id=None):
+        query = np.asarray(encoding, dtype=np.float32).reshape(self.dim)
+        with self._lock:
+            conflicts = [conflict for index in self._partitions.values() for conflict in index.find_duplicates(query, tolerance)]
+            for pending_id, pending_encoding in self._pending.items():
+                distance = float(np.linalg.norm(pending_encoding - query))
+                if distance <= tolerance:
+                    conflicts.append((pending_id, distance))
+        if exclude_id is not None:
+            conflicts = [c for c in conflicts if c[0] != exclude_id]
+        conflicts.sort(key=lambda c: c[1])
+        return conflicts
+
+    def reserve(self, face_id, encoding, tolerance=0.4):
+        """Lihat `GalleryIndex.reserve`; reservasi berlaku untuk seluruh partisi."""
+        face_id = int(face_id)
+        query = np.asarray(encoding, dtype=np.float32).reshape(self.dim)
+        with self._lock:
+            if face_id in self._pending:
+                return [(face_id, 0.0)]
+            conflicts = self.find_duplicates(query, tolerance=tolerance)
+            if not conflicts:
+                self._pending[face_id] = query
+            return conflicts
+
+    def release(self, face_id):
+        with self._lock:
+            self._pending.pop(int(face_id), None)
+
+    # -------------------------------------------------------------------------
+    # Statistik
+    # -------------------------------------------------------------------------
+    def partition_stats(self):
+        """Jumlah identitas, template, dan memori (byte) per partisi, terurut dari yang terbesar."""
+        with self._lock:
+            stats = [{
+                'partition': partition,
+                'identities': len(index),
+                'templates': index.template_count,
+                'memory_bytes': index.memory_bytes,
+                'memory_mapped': isinstance(index._encodings, np.memmap),
+                'ann_trained': bool(index.ann is not None and index.ann.trained),
+                'ann_training': index.ann_training,
+            } for partition, index in self._partitions.items()]
+        stats.sort(key=lambda item: item['templates'], reverse=True)
+        return stats
+
+
+def _merge(results, top_k):
+    """Menggabungkan hasil `search` beberapa partisi (identitas saling lepas) menjadi `top_k` terdekat."""
+    if len(results) == 1:
+        return results[0]
+    merged = [match for matches in results for match in matches]
+    merged.sort(key=lambda match: match[1])
+    return merged[:max(1, int(top_k))]
+
+
+def _top_k(ids, dists, top_k, tolerance):
+    """Memilih `top_k` jarak terkecil (opsional <= tolerance) sebagai list (id, jarak)."""
+    if len(ids) == 0:
+        return []
+    top_k = max(1, min(int(top_k), len(ids)))
+    if top_k < len(ids):
+        candidates = np.argpartition(dists, top_k - 1)[:top_k]
+    else:
+        candidates = np.arange(len(ids))
+    candidates = candidates[np.argsort(dists[candidates], kind='stable')]
+    if tolerance is not None:
+        candidates = candidates[dists[candidates] <= tolerance]
+    return [(int(ids[i]), float(dists[i])) for i in candidates]
@@ -0,0 +1,119 @@
+# gallery_snapshot.py
+
+import json
+import os
+import struct
+
+import numpy as np
+
+# =============================================================================
+# SNAPSHOT GALERI (FILE MEMORY-MAPPED)
+# =============================================================================
+# Tata letak file (semua little-endian):
+#   MAGIC (8 byte) | panjang header (uint32) | header JSON | padding | array...
+# Header berisi versi format, metadata snapshot, daftar partisi (rentang baris),
+# serta offset/dtype/shape setiap array. Setiap partisi menempati rentang baris
+# kontigu dengan kapasitas cadangan, sehingga identitas baru bisa ditambahkan
+# tanpa menyalin ulang seluruh matriks.
+MAGIC = b'FGALSNAP'
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+ROW_ARRAYS = (('encodings', np.float32), ('sq_norms', np.float32), ('ids', np.int64),
+              ('keys', np.int64), ('slots', np.int64), ('slot_ids', np.int64))
+
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _headroom(size):
+    # Kapasitas cadangan per partisi untuk registrasi setelah snapshot dibuat
+    return max(16, size // 8)
+
+
+def write_snapshot(path, partitions, dim, meta=None):
+    """
+    Menulis snapshot ke `path` secara atomik (file sementara lalu rename, sehingga
+    worker yang sedang memetakan file lama tidak terganggu). `partitions` berupa
+    iterable (kunci_partisi, arrays) dengan arrays dari `GalleryIndex.export_arrays()`.
+    Mengembalikan header yang ditulis.
+    """
+    layout, total = [], 0
+    partitions = list(partitions)
+    for partition, arrays in partitions:
+        size, slots = len(arrays['keys']), len(arrays['slot_ids'])
+        capacity = size + _headroom(size)
+        layout.append({'partition': partition, 'offset': total, 'size': size, 'slots': slots, 'capacity': capacity})
+        total += capacity
+
+    # Offset array relatif terhadap awal area data (setelah header, selaras ALIGNMENT)
+    header = {'format_version': FORMAT_VERSION, 'dim': dim, 'rows': total, 'meta': meta or {},
+              'partitions': layout, 'arrays': {}}
+    offset = 0
+    for name, dtype in ROW_ARRAYS:
+        shape = (total, dim) if name == 'encodings' else (total,)
+        offset = _align(offset)
+        header['arrays'][name] = {'dtype': np.dtype(dtype).str, 'offset': offset, 'shape': list(shape)}
+        offset += int(np.prod(shape)) * np.dtype(dtype).itemsize
+    encoded = json.dumps(header).encode('utf-8')
+    data_start = _align(len(MAGIC) + 4 + len(encoded))
+
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC + struct.pack('<I', len(encoded)) + encoded)
+        f.truncate(data_start + offset)
+    for name, dtype in ROW_ARRAYS:
+        spec = header['arrays'][name]
+        if total == 0:
+            break
+        target = np.memmap(tmp_path, dtype=dtype, mode='r+', offset=data_start + spec['offset'], shape=tuple(spec['shape']))
+        for (_, arrays), part in zip(partitions, layout):
+            values = arrays[name]
+            target[part['offset']:part['offset'] + len(values)] = values
+        target.flush()
+        del target
+    os.replace(tmp_path, path)
+    return header
+
+
+class GallerySnapshot:
+    """
+    Snapshot galeri yang dipetakan ke memori dalam mode copy-on-write: halaman file
+    dibagi antar proses oleh page cache OS, dan hanya halaman yang diubah (upsert /
+    remove setelah startup) yang disalin menjadi milik proses itu sendiri.
+    """
+
+    def __init__(self, path, dim=None):
+        self.path = path
+        with open(path, 'rb') as f:
+            prefix = f.read(len(MAGIC) + 4)
+            if len(prefix) < len(MAGIC) + 4 or prefix[:len(MAGIC)] != MAGIC:
+                raise ValueError(f"{path} bukan file snapshot galeri")
+            (length,) = struct.unpack('<I', prefix[len(MAGIC):])
+            self.header = json.loads(f.read(length).decode('utf-8'))
+        data_start = _align(len(MAGIC) + 4 + length)
+        if self.header.get('format_version') != FORMAT_VERSION:
+            raise ValueError(f"Versi snapshot {self.header.get('format_version')} tidak didukung (harus {FORMAT_VERSION})")
+        if dim is not None and self.header['dim'] != dim:
+            raise ValueError(f"Dimensi snapshot {self.header['dim']} tidak sama dengan {dim}")
+        self.dim = self.header['dim']
+        self.meta = self.header['meta']
+        self._arrays = {
+            name: np.empty(tuple(spec['shape']), dtype=np.dtype(spec['dtype'])) if self.header['rows'] == 0 else np.memmap(path, dtype=np.dtype(spec['dtype']), mode='c', offset=data_start + spec['offset'],
+                            shape=tuple(spec['shape']))
+            for name, spec in self.header['arrays'].items()
+        }
+
+    def partitions(self):
+        """
+        Iterasi (kunci_partisi, arrays, size, slots) per partisi; arrays berupa view
+        (tanpa salinan) sepanjang kapasitas partisi, siap untuk `GalleryIndex.adopt`.
+        """
+        for part in self.header['partitions']:
+            start, stop = part['offset'], part['offset'] + part['capacity']
+            arrays = {name: array[start:stop] for name, array in self._arrays.items()}
+            yield part['partition'], arrays, part['size'], part['slots']
+
+    @property
+    def template_count(self):
+        return sum(part['size'] for part in self.header['partitions'])
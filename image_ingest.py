@@ -0,0 +1,158 @@
+# image_ingest.py
+
+import logging
+import os
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import cv2
+import numpy as np
+
+# =============================================================================
+# DECODE UPLOAD (SEKALI, RESOLUSI DIKURANGI)
+# =============================================================================
+# JPEG besar di-decode langsung pada 1/2, 1/4 atau 1/8 resolusi oleh libjpeg
+# (IMREAD_REDUCED_COLOR_*), jauh lebih murah daripada decode penuh lalu resize.
+# Faktor dipilih dari ukuran di header sehingga sisi terpanjang hasil decode
+# tidak kurang dari `min_dimension` (cukup detail untuk potongan wajah).
+REDUCED_FLAGS = ((8, cv2.IMREAD_REDUCED_COLOR_8), (4, cv2.IMREAD_REDUCED_COLOR_4), (2, cv2.IMREAD_REDUCED_COLOR_2))
+
+
+def image_size(data):
+    """(lebar, tinggi) dari header JPEG / PNG / GIF tanpa decode, atau None jika tidak dikenali."""
+    if data[:8] == b'\x89PNG\r\n\x1a\n' and len(data) >= 24:
+        return struct.unpack('>II', data[16:24])
+    if data[:6] in (b'GIF87a', b'GIF89a') and len(data) >= 10:
+        return struct.unpack('<HH', data[6:10])
+    if data[:2] != b'\xff\xd8':
+        return None
+    i = 2
+    while i + 9 <= len(data):
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:
+            i += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+            i += 2
+            continue
+        (length,) = struct.unpack('>H', data[i + 2:i + 4])
+        # SOF0..SOF15 (kecuali DHT, JPG, DAC): presisi, tinggi, lebar
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            height, width = struct.unpack('>HH', data[i + 5:i + 9])
+            return width, height
+        i += 2 + length
+    return None
+
+
+def decode_scale(data, min_dimension=0):
+    """
+    Faktor reduksi decode (1, 2, 4 atau 8): terbesar yang masih menyisakan
+    >= min_dimension piksel pada sisi terpanjang (JPEG saja, selain itu 1).
+    Koordinat pada gambar hasil decode x faktor ini = koordinat foto asli.
+    """
+    if not min_dimension or data[:2] != b'\xff\xd8':
+        return 1
+    size = image_size(data)
+    if size is None:
+        return 1
+    longest = max(size)
+    for factor, _ in REDUCED_FLAGS:
+        if longest // factor >= min_dimension:
+            return factor
+    return 1
+
+
+def decode_flag(data, min_dimension=0):
+    """Flag imdecode untuk faktor reduksi dari `decode_scale`."""
+    return dict(REDUCED_FLAGS).get(decode_scale(data, min_dimension), cv2.IMREAD_COLOR)
+
+
+def decode_image(data, min_dimension=0):
+    """
+    Decode byte upload menjadi gambar BGR, sekali per upload; hasilnya dipakai
+    bersama oleh liveness, deteksi dan encoding. None jika tidak bisa dibaca.
+    """
+    return cv2.imdecode(np.frombuffer(data, np.uint8), decode_flag(data, min_dimension))
+
+
+# =============================================================================
+# PENULISAN FILE UPLOAD DI LATAR BELAKANG
+# =============================================================================
+class UploadWriter:
+    """
+    Menulis byte asli upload ke disk (file sementara lalu rename) di thread latar,
+    di luar jalur request. Urutan tugas dipertahankan (satu thread), sehingga
+    penghapusan file lama selalu terjadi setelah file baru tertulis. Dengan
+    `enabled=False` semua operasi dijalankan langsung (sinkron).
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='upload-writer') if enabled else None
+        self._futures = set()
+        self._lock = threading.Lock()
+        self.written = 0
+        self.removed = 0
+        self.failed = 0
+
+    def save(self, path, data):
+        """Menjadwalkan penulisan `data` ke `path`."""
+        return self._submit(self._write, path, data)
+
+    def remove(self, path):
+        """Menjadwalkan penghapusan `path` (jika ada) setelah tugas sebelumnya."""
+        return self._submit(self._remove, path)
+
+    def _submit(self, fn, *args):
+        if self._executor is None:
+            return self._run(fn, *args)
+        future = self._executor.submit(self._run, fn, *args)
+        with self._lock:
+            self._futures.add(future)
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future):
+        with self._lock:
+            self._futures.discard(future)
+
+    def _run(self, fn, *args):
+        try:
+            fn(*args)
+            return True
+        except OSError as e:
+            with self._lock:
+                self.failed += 1
+            logging.error(f"Gagal menulis/menghapus file upload {args[0]}: {e}")
+            return False
+
+    def _write(self, path, data):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self.written += 1
+
+    def _remove(self, path):
+        if os.path.exists(path):
+            os.remove(path)
+            with self._lock:
+                self.removed += 1
+
+    def flush(self, timeout=None):
+        """Menunggu semua tugas yang sudah dijadwalkan selesai."""
+        with self._lock:
+            futures = list(self._futures)
+        wait(futures, timeout=timeout)
+
+    def stats(self):
+        with self._lock:
+            return {'enabled': self.enabled, 'pending': len(self._futures), 'written': self.written,
+                    'removed': self.removed, 'failed': self.failed}
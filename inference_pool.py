@@ -0,0 +1,116 @@
+# inference_pool.py
+
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+
+from metrics import record_stage, timed_call
+
+# =============================================================================
+# POOL WORKER INFERENSI DENGAN ADMISSION CONTROL
+# =============================================================================
+class PoolSaturated(Exception):
+    """Antrian inferensi penuh atau batas waktu terlampaui; klien sebaiknya mencoba lagi."""
+
+    def __init__(self, message, retry_after=1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _run_before_deadline(deadline, fn, args):
+    # Dijalankan di worker: tugas yang sudah kedaluwarsa saat keluar dari antrian
+    # tidak dikerjakan, karena peminta sudah berhenti menunggu.
+    if time.time() > deadline:
+        raise PoolSaturated('Batas waktu terlampaui sebelum diproses')
+    return fn(*args)
+
+
+def _worker_pid(hold):
+    # Ditahan sebentar agar tugas warm-up tersebar ke worker yang berbeda
+    time.sleep(hold)
+    return os.getpid()
+
+
+class InferencePool:
+    """
+    Process pool berisi worker yang memuat model dlib (detector, predictor, encoder)
+    sekali per proses. Jumlah tugas yang sedang berjalan + mengantri dibatasi;
+    jika penuh, `run()` langsung melempar PoolSaturated agar endpoint bisa
+    membalas 503 + Retry-After alih-alih membiarkan latensi terus bertambah.
+    """
+
+    def __init__(self, workers, max_queue, timeout, retry_after=1, initializer=None):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._initializer = initializer
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        # Proses worker baru dibuat saat pertama dipakai, bukan saat modul diimpor
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=self._initializer)
+        return self._executor
+
+    def submit(self, fn, *args, timeout=None):
+        """Mengirim tugas ke pool; melempar PoolSaturated jika antrian penuh."""
+        if not self._slots.acquire(blocking=False):
+            raise PoolSaturated('Antrian inferensi penuh', self.retry_after)
+        deadline = time.time() + (timeout or self.timeout)
+        try:
+            future = self._get_executor().submit(_run_before_deadline, deadline, fn, args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def run(self, fn, *args, timeout=None):
+        """Menjalankan `fn(*args)` di worker dan menunggu hasilnya sampai batas waktu."""
+        timeout = timeout or self.timeout
+        future = self.submit(fn, *args, timeout=timeout)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise PoolSaturated('Batas waktu inferensi terlampaui', self.retry_after)
+
+    def run_timed(self, fn, *args):
+        """
+        `run` yang juga mencatat tahap yang diukur di dalam worker (detect,
+        landmarks, encode) ke request yang sedang berjalan, dan sisanya (antrian
+        pool + serialisasi) sebagai tahap 'inference_wait'.
+        """
+        started = time.perf_counter()
+        result, timings = self.run(timed_call, fn, *args)
+        elapsed = time.perf_counter() - started
+        for name, seconds in timings.items():
+            record_stage(name, seconds)
+        record_stage('inference_wait', max(0.0, elapsed - sum(timings.values())))
+        return result
+
+    def warm_up(self, timeout=60):
+        """
+        Membuat worker sekarang (initializer masing-masing memuat dan memanaskan model)
+        dan menunggu sampai semuanya merespons atau `timeout` detik berlalu, sehingga
+        request pertama tidak menanggung biaya pemuatan model. Mengembalikan jumlah
+        worker yang sudah merespons.
+        """
+        executor = self._get_executor()
+        deadline = time.monotonic() + timeout
+        pids = set()
+        while len(pids) < self.workers and time.monotonic() < deadline:
+            futures = [executor.submit(_worker_pid, 0.05) for _ in range(self.workers)]
+            pids.update(future.result(timeout=max(deadline - time.monotonic(), 0)) for future in futures)
+        return len(pids)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
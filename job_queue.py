@@ -0,0 +1,253 @@
+# job_queue.py
+
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+
+# =============================================================================
+# ANTRIAN JOB PERSISTEN (SQLITE, TANPA BROKER)
+# =============================================================================
+class JobQueue:
+    """
+    Antrian job di file SQLite lokal (mode WAL) yang bisa dipakai bersama oleh
+    beberapa worker thread maupun process di host yang sama. Job diambil secara
+    atomik (`claim`, transaksi BEGIN IMMEDIATE), sehingga satu job hanya
+    dikerjakan oleh satu worker. Status: queued -> running -> done / failed.
+    Worker memperbarui heartbeat job yang sedang dikerjakan (`progress` /
+    `heartbeat`); job baru dianggap macet jika heartbeat-nya berhenti.
+    Data input (mis. byte foto) disimpan di baris job dan dihapus saat job selesai.
+    """
+
+    def __init__(self, path, stale_after=600, keep_seconds=86400, max_attempts=3):
+        self.path = path
+        # Job 'running' tanpa heartbeat selama `stale_after` detik (worker mati) diantrikan
+        # ulang, paling banyak sampai `max_attempts` percobaan
+        self.stale_after = stale_after
+        self.max_attempts = max_attempts
+        # Job selesai / gagal disimpan selama `keep_seconds` agar statusnya bisa dibaca
+        self.keep_seconds = keep_seconds
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = self._connection()
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS jobs ('
+            ' id TEXT PRIMARY KEY, kind TEXT NOT NULL, status TEXT NOT NULL, params TEXT,'
+            ' data BLOB, progress TEXT, result TEXT, status_code INTEGER, attempts INTEGER DEFAULT 0,'
+            ' worker TEXT, created_at REAL, started_at REAL, heartbeat_at REAL, finished_at REAL)'
+        )
+        # File antrian lama (dibuat sebelum ada kolom heartbeat)
+        columns = {row['name'] for row in connection.execute('PRAGMA table_info(jobs)')}
+        if 'heartbeat_at' not in columns:
+            connection.execute('ALTER TABLE jobs ADD COLUMN heartbeat_at REAL')
+        connection.execute('CREATE INDEX IF NOT EXISTS ix_jobs_status_created ON jobs (status, created_at)')
+
+    def _connection(self):
+        # Satu koneksi SQLite per thread (autocommit; transaksi eksplisit di `claim`)
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.row_factory = sqlite3.Row
+            self._local.connection = connection
+        return connection
+
+    def submit(self, kind, params, data=None):
+        """Menambahkan job baru dan mengembalikan ID-nya."""
+        job_id = uuid.uuid4().hex
+        self._connection().execute(
+            'INSERT INTO jobs (id, kind, status, params, data, progress, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (job_id, kind, 'queued', json.dumps(params), data, 'queued', time.time())
+        )
+        return job_id
+
+    def claim(self, worker):
+        """
+        Mengambil job 'queued' paling lama secara atomik dan menandainya 'running'.
+        Mengembalikan dict job (termasuk 'params' dan 'data'), atau None jika antrian kosong.
+        """
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            row = connection.execute(
+                "SELECT id, kind, params, data, attempts FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                connection.execute('COMMIT')
+                return None
+            now = time.time()
+            connection.execute(
+                "UPDATE jobs SET status = 'running', progress = 'started', worker = ?, started_at = ?, heartbeat_at = ?,"
+                " attempts = attempts + 1 WHERE id = ?",
+                (worker, now, now, row['id'])
+            )
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        return {'id': row['id'], 'kind': row['kind'], 'params': json.loads(row['params']),
+                'data': row['data'], 'attempts': row['attempts'] + 1}
+
+    def progress(self, job_id, stage):
+        """Mencatat tahap yang sedang dikerjakan (dibaca lewat `get`) sekaligus memperbarui heartbeat."""
+        self._connection().execute(
+            "UPDATE jobs SET progress = ?, heartbeat_at = ? WHERE id = ? AND status = 'running'", (stage, time.time(), job_id)
+        )
+
+    def heartbeat(self, job_id):
+        """Menandai job masih dikerjakan (worker hidup) tanpa mengubah tahapnya."""
+        self._connection().execute("UPDATE jobs SET heartbeat_at = ? WHERE id = ? AND status = 'running'", (time.time(), job_id))
+
+    def finish(self, job_id, result, status_code):
+        """Menyimpan hasil job. Status 'done' untuk status_code < 500, selain itu 'failed'."""
+        status = 'done' if status_code < 500 else 'failed'
+        self._connection().execute(
+            'UPDATE jobs SET status = ?, progress = ?, result = ?, status_code = ?, data = NULL, finished_at = ? WHERE id = ?',
+            (status, status, json.dumps(result), status_code, time.time(), job_id)
+        )
+
+    def get(self, job_id):
+        """Status job (tanpa data input), atau None jika tidak ada / sudah dibersihkan."""
+        row = self._connection().execute(
+            'SELECT id, kind, status, progress, result, status_code, attempts, created_at, started_at, heartbeat_at, finished_at'
+            ' FROM jobs WHERE id = ?', (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        if job['status'] == 'queued':
+            job['position'] = self._connection().execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND created_at < ?", (job['created_at'],)
+            ).fetchone()[0]
+        return job
+
+    def maintain(self):
+        """
+        Mengantrikan ulang job 'running' yang macet (heartbeat berhenti lebih dari
+        `stale_after` detik, mis. worker mati), menggagalkan job macet yang sudah
+        `max_attempts` kali dicoba, dan menghapus job selesai yang lebih lama dari
+        `keep_seconds`. Job yang worker-nya masih hidup tidak diantrikan ulang
+        selama heartbeat-nya berjalan. Mengembalikan (diantrikan_ulang, dihapus).
+        """
+        now = time.time()
+        stale = "status = 'running' AND COALESCE(heartbeat_at, started_at) < ?"
+        connection = self._connection()
+        connection.execute(
+            "UPDATE jobs SET status = 'failed', progress = 'failed', result = ?, status_code = 500, data = NULL, finished_at = ?"
+            f" WHERE {stale} AND attempts >= ?",
+            (json.dumps({'message': 'Job gagal: worker berhenti sebelum job selesai'}), now, now - self.stale_after, self.max_attempts)
+        )
+        requeued = connection.execute(
+            f"UPDATE jobs SET status = 'queued', progress = 'requeued', worker = NULL WHERE {stale}",
+            (now - self.stale_after,)
+        ).rowcount
+        purged = connection.execute(
+            "DELETE FROM jobs WHERE status IN ('done', 'failed') AND finished_at < ?", (now - self.keep_seconds,)
+        ).rowcount
+        return requeued, purged
+
+    def stats(self):
+        counts = dict(self._connection().execute('SELECT status, COUNT(*) FROM jobs GROUP BY status').fetchall())
+        return {status: counts.get(status, 0) for status in ('queued', 'running', 'done', 'failed')}
+
+
+# =============================================================================
+# WORKER THREAD PEMROSES JOB
+# =============================================================================
+class JobWorkers:
+    """
+    Sekumpulan worker thread yang mengambil job dari `JobQueue` dan memanggil
+    `handler(job, progress)` yang mengembalikan (hasil, status_code); exception
+    dicatat sebagai job gagal (500). Thread dibuat saat pertama dibutuhkan (bukan
+    saat modul diimpor, aman untuk server yang melakukan fork). Worker dibangunkan
+    langsung oleh `notify` untuk job dari proses ini, dan mem-poll antrian setiap
+    `poll_interval` detik untuk job dari proses lain.
+    """
+
+    def __init__(self, queue, handler, workers=1, poll_interval=1.0, name='job-worker'):
+        self.queue = queue
+        self.handler = handler
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.name = name
+        self._threads = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition()
+        self._pending_wakeups = 0
+        self._stopping = False
+        self.processed = 0
+        self.failed = 0
+
+    def start(self):
+        with self._lock:
+            self._threads = [thread for thread in self._threads if thread.is_alive()]
+            if not self._threads:
+                self.queue.maintain()
+            self._stopping = False
+            prefix = f'{self.name}-{socket.gethostname()}-{os.getpid()}'
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._loop, args=(f'{prefix}-{len(self._threads)}',), name=self.name, daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def notify(self):
+        """Membangunkan satu worker untuk job yang baru diantrikan (dan memulai thread jika belum)."""
+        self.start()
+        with self._wakeup:
+            self._pending_wakeups += 1
+            self._wakeup.notify()
+
+    def stop(self, timeout=None):
+        with self._wakeup:
+            self._stopping = True
+            self._wakeup.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _wait(self):
+        with self._wakeup:
+            if self._pending_wakeups == 0 and not self._stopping:
+                self._wakeup.wait(self.poll_interval)
+            self._pending_wakeups = max(0, self._pending_wakeups - 1)
+
+    def _loop(self, worker):
+        last_maintain = time.monotonic()
+        while not self._stopping:
+            try:
+                job = self.queue.claim(worker)
+            except sqlite3.Error as e:
+                logging.warning(f"Gagal mengambil job dari antrian: {e}")
+                job = None
+            if job is None:
+                self._wait()
+                if time.monotonic() - last_maintain > self.queue.stale_after / 2:
+                    last_maintain = time.monotonic()
+                    self.queue.maintain()
+                continue
+
+            try:
+                result, status_code = self.handler(job, lambda stage: self.queue.progress(job['id'], stage))
+            except Exception as e:
+                logging.error(f"Job {job['id']} ({job['kind']}) gagal: {e}")
+                result, status_code = {'message': 'Terjadi kesalahan internal'}, 500
+            try:
+                self.queue.finish(job['id'], result, status_code)
+            except sqlite3.Error as e:
+                logging.error(f"Gagal menyimpan hasil job {job['id']}: {e}")
+            with self._lock:
+                self.processed += 1
+                if status_code >= 500:
+                    self.failed += 1
+
+    def stats(self):
+        with self._lock:
+            alive = sum(1 for thread in self._threads if thread.is_alive())
+            return {'workers': self.workers, 'alive': alive, 'processed': self.processed, 'failed': self.failed}
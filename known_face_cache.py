@@ -0,0 +1,122 @@
+# known_face_cache.py
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# =============================================================================
+# CACHE ENCODING PER IDENTITAS (VERIFIKASI 1:1)
+# =============================================================================
+class KnownFaceCache:
+    """
+    Cache LRU berbatas jumlah entri yang memetakan user_id ke data identitas
+    ('id', 'nama', 'id_member') beserta seluruh template encoding yang sudah
+    didekode ('encodings', ndarray float32 k x 128). Pada cache hit, verifikasi 1:1 tidak perlu query database maupun
+    parsing encoding. Entri harus di-`invalidate` setiap kali data wajah diubah
+    atau dihapus.
+    """
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        # Naik setiap invalidasi; pengisian dari database yang dimulai sebelum
+        # invalidasi tidak disimpan agar data lama tidak masuk kembali ke cache
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    def get(self, user_id):
+        """Mengembalikan entri identitas untuk `user_id`, atau None jika tidak ada di cache."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry
+
+    def get_or_load(self, user_id, loader):
+        """
+        Seperti `get`, tetapi pada cache miss memanggil `loader(user_id)` yang
+        mengembalikan (nama, id_member, encodings) atau None, lalu menyimpan hasilnya.
+        """
+        entry = self.get(user_id)
+        if entry is not None:
+            return entry
+        with self._lock:
+            generation = self._generation
+        loaded = loader(user_id)
+        if loaded is None:
+            return None
+        return self.put(user_id, *loaded, generation=generation)
+
+    def put(self, user_id, nama, id_member, encodings, generation=None):
+        """
+        Menyimpan identitas dan mengembalikan entrinya; entri paling lama tidak
+        dipakai dibuang bila cache penuh. Identitas tanpa encoding tidak disimpan.
+        """
+        if encodings is not None:
+            encodings = np.array(encodings, dtype=np.float32, ndmin=2)
+            encodings.setflags(write=False)
+        entry = {'id': user_id, 'nama': nama, 'id_member': id_member, 'encodings': encodings}
+        if not self.enabled or encodings is None:
+            return entry
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return entry
+            self._entries[user_id] = entry
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return entry
+
+    def invalidate(self, user_id):
+        """Membuang entri `user_id` (dipanggil setelah update/hapus data wajah)."""
+        with self._lock:
+            self._generation += 1
+            return self._entries.pop(user_id, None) is not None
+
+    def warm(self, rows):
+        """
+        Mengisi cache secara massal dari iterable (user_id, nama, id_member, encodings),
+        misalnya saat startup. Berhenti saat cache penuh. Mengembalikan jumlah entri.
+        """
+        count = 0
+        for user_id, nama, id_member, encodings in rows:
+            if count >= self.max_entries:
+                break
+            self.put(user_id, nama, id_member, encodings)
+            count += 1
+        return count
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self):
+        """Ringkasan metrik cache."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,234 @@
+# metrics.py
+
+import bisect
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from flask import Response, g, request
+
+# Batas bucket histogram (detik), mengikuti default klien Prometheus
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUANTILES = (0.5, 0.95, 0.99)
+
+# =============================================================================
+# PENCATATAN WAKTU PER TAHAP (PER THREAD / REQUEST)
+# =============================================================================
+# Setiap request (atau tugas di worker pool) mengumpulkan durasi tahapnya di
+# dict thread-local. Di luar pengumpulan, `stage()` tidak mencatat apa pun.
+_local = threading.local()
+
+
+def start_timings():
+    _local.timings = {}
+    return _local.timings
+
+
+def stop_timings():
+    timings = getattr(_local, 'timings', None)
+    _local.timings = None
+    return timings or {}
+
+
+def record_stage(name, seconds):
+    """Menambahkan durasi ke tahap `name` milik request yang sedang berjalan."""
+    timings = getattr(_local, 'timings', None)
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+
+@contextmanager
+def stage(name):
+    """Context manager untuk mengukur satu tahap: `with stage('decode'): ...`."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - started)
+
+
+def timed_call(fn, *args):
+    """
+    Dijalankan di worker pool: memanggil `fn(*args)` sambil mengumpulkan tahap
+    yang diukur di dalamnya. Mengembalikan (hasil, timings).
+    """
+    start_timings()
+    try:
+        result = fn(*args)
+    finally:
+        timings = stop_timings()
+    return result, timings
+
+
+# =============================================================================
+# HISTOGRAM & REGISTRY METRIK
+# =============================================================================
+class Histogram:
+    """
+    Histogram kumulatif ala Prometheus (bucket, sum, count) ditambah jendela
+    observasi terbaru untuk menghitung p50/p95/p99 langsung di server.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, window=1024):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.recent = deque(maxlen=window)
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        self.recent.append(value)
+
+    def quantiles(self, quantiles=QUANTILES):
+        values = sorted(self.recent)
+        if not values:
+            return {q: 0.0 for q in quantiles}
+        return {q: values[min(len(values) - 1, int(q * len(values)))] for q in quantiles}
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for value in labels.values())
+    return '{' + ','.join(f'{key}="{value}"' for key, value in zip(labels, escaped)) + '}'
+
+
+def _value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value))
+
+
+class MetricsRegistry:
+    """
+    Menyimpan latensi request dan latensi per tahap (per endpoint), jumlah
+    request per status, serta metrik tambahan dari collector; semuanya
+    dirender dalam format teks Prometheus oleh `render()`.
+    """
+
+    def __init__(self, namespace='faceapi', buckets=DEFAULT_BUCKETS, window=1024):
+        self.namespace = namespace
+        self.buckets = buckets
+        self.window = window
+        self._lock = threading.Lock()
+        self._requests = {}
+        self._request_durations = {}
+        self._stage_durations = {}
+        self._collectors = []
+
+    def _histogram(self, table, key):
+        histogram = table.get(key)
+        if histogram is None:
+            histogram = table[key] = Histogram(self.buckets, self.window)
+        return histogram
+
+    def observe_request(self, endpoint, status, seconds, timings=None):
+        with self._lock:
+            key = (endpoint, str(status))
+            self._requests[key] = self._requests.get(key, 0) + 1
+            self._histogram(self._request_durations, endpoint).observe(seconds)
+            for name, stage_seconds in (timings or {}).items():
+                self._histogram(self._stage_durations, (endpoint, name)).observe(stage_seconds)
+
+    def register_collector(self, collector):
+        """
+        Mendaftarkan fungsi yang dipanggil saat scrape dan mengembalikan list
+        (nama, tipe, help, nilai), dengan nilai berupa angka atau list (labels, angka).
+        """
+        self._collectors.append(collector)
+        return collector
+
+    def stage_summary(self):
+        """Ringkasan p50/p95/p99 (ms) per endpoint dan tahap, untuk tampilan JSON."""
+        with self._lock:
+            return {
+                f'{endpoint}.{name}': {f'p{int(q * 100)}': round(v * 1000.0, 3) for q, v in histogram.quantiles().items()}
+                for (endpoint, name), histogram in sorted(self._stage_durations.items())
+            }
+
+    def render(self):
+        """Merender seluruh metrik dalam format teks eksposisi Prometheus 0.0.4."""
+        ns = self.namespace
+        lines = []
+        with self._lock:
+            lines += [f'# HELP {ns}_requests_total Jumlah request per endpoint dan status HTTP.',
+                      f'# TYPE {ns}_requests_total counter']
+            for (endpoint, status), count in sorted(self._requests.items()):
+                lines.append(f'{ns}_requests_total{_labels({"endpoint": endpoint, "status": status})} {count}')
+
+            self._render_histograms(lines, f'{ns}_request_duration_seconds', 'Latensi total request (detik).',
+                                    {(endpoint,): h for endpoint, h in self._request_durations.items()}, ('endpoint',))
+            self._render_histograms(lines, f'{ns}_stage_duration_seconds', 'Latensi per tahap pemrosesan request (detik).',
+                                    self._stage_durations, ('endpoint', 'stage'))
+
+        for collector in self._collectors:
+            for name, metric_type, help_text, value in collector():
+                lines += [f'# HELP {ns}_{name} {help_text}', f'# TYPE {ns}_{name} {metric_type}']
+                samples = value if isinstance(value, list) else [({}, value)]
+                lines += [f'{ns}_{name}{_labels(labels)} {_value(sample)}' for labels, sample in samples]
+        return '\n'.join(lines) + '\n'
+
+    def _render_histograms(self, lines, name, help_text, histograms, label_names):
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+        for key, histogram in sorted(histograms.items()):
+            labels = dict(zip(label_names, key))
+            cumulative = 0
+            for bound, count in zip(histogram.buckets + (float('inf'),), histogram.counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{_labels({**labels, "le": _value(bound)})} {cumulative}')
+            lines.append(f'{name}_sum{_labels(labels)} {_value(histogram.sum)}')
+            lines.append(f'{name}_count{_labels(labels)} {histogram.count}')
+
+        # Kuantil dari observasi terbaru sebagai summary terpisah
+        lines += [f'# HELP {name}_recent {help_text[:-1]} pada {self.window} observasi terakhir.',
+                  f'# TYPE {name}_recent summary']
+        for key, histogram in sorted(histograms.items()):
+            labels = dict(zip(label_names, key))
+            for q, value in histogram.quantiles().items():
+                lines.append(f'{name}_recent{_labels({**labels, "quantile": str(q)})} {_value(value)}')
+            lines.append(f'{name}_recent_sum{_labels(labels)} {_value(sum(histogram.recent))}')
+            lines.append(f'{name}_recent_count{_labels(labels)} {len(histogram.recent)}')
+
+
+# =============================================================================
+# INTEGRASI FLASK
+# =============================================================================
+def server_timing_header(timings, total):
+    """Format header `Server-Timing` (ms) dari timings per tahap."""
+    parts = [f'{name};dur={seconds * 1000.0:.2f}' for name, seconds in timings.items()]
+    parts.append(f'total;dur={total * 1000.0:.2f}')
+    return ', '.join(parts)
+
+
+def instrument_app(app, registry, timing_header=False, path='/metrics'):
+    """
+    Memasang pengukuran latensi pada setiap request dan endpoint `path` yang
+    menyajikan metrik Prometheus. Jika `timing_header` aktif, rincian waktu
+    per tahap dikirim di header `Server-Timing`.
+    """
+
+    @app.before_request
+    def _start_request_timer():
+        g._metrics_started = time.perf_counter()
+        start_timings()
+
+    @app.after_request
+    def _finish_request_timer(response):
+        started = g.pop('_metrics_started', None)
+        timings = stop_timings()
+        if started is None:
+            return response
+        total = time.perf_counter() - started
+        registry.observe_request(request.endpoint or 'unknown', response.status_code, total, timings)
+        if timing_header:
+            response.headers['Server-Timing'] = server_timing_header(timings, total)
+        return response
+
+    def metrics_endpoint():
+        return Response(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+    app.add_url_rule(path, 'metrics', metrics_endpoint)
@@ -1,13 +1,69 @@
+from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.orm import deferred
+from face_codec import encode_encoding, decode_encoding, decode_json
 
 db = SQLAlchemy()
 
 class RegisteredFace(db.Model):
     id = db.Column(db.Integer, primary_key=True, autoincrement=False)
-    id_member = db.Column(db.Integer, nullable=True)
+    id_member = db.Column(db.Integer, nullable=True, index=True)
     nama = db.Column(db.String(100), nullable=False)
     file_path = db.Column(db.String(200), nullable=False)
     url_face_img = db.Column(db.String(255), nullable=True)
-    face_encoding = db.Column(db.Text, nullable=False)
+    # Format lama (JSON), tetap dibaca sebagai fallback selama migrasi. Deferred:
+    # teks ini hanya dimuat saat diakses (baris yang belum punya format biner)
+    face_encoding = deferred(db.Column(db.Text, nullable=False, default=''))
+    # Format biner berversi, lihat face_codec.py
+    face_encoding_bin = db.Column(db.LargeBinary, nullable=True)
+    # Waktu perubahan terakhir; dipakai untuk menerapkan perubahan setelah snapshot galeri
+    updated_at = db.Column(db.DateTime, nullable=True, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-    __tablename__ = 'registered_faces'
\ No newline at end of file
+    # Template tambahan (foto enrollment lain / hasil verifikasi), lihat FaceTemplate
+    templates = db.relationship('FaceTemplate', backref='face', cascade='all, delete-orphan',
+                                order_by='FaceTemplate.id')
+
+    __tablename__ = 'registered_faces'
+
+    def get_encoding(self):
+        """Mengembalikan encoding sebagai ndarray, atau None jika belum ada."""
+        if self.face_encoding_bin:
+            return decode_encoding(self.face_encoding_bin)
+        if self.face_encoding:
+            return decode_json(self.face_encoding)
+        return None
+
+    def set_encoding(self, encoding):
+        """Menyimpan encoding dalam format biner dan mengosongkan kolom JSON lama."""
+        self.face_encoding_bin = encode_encoding(encoding)
+        self.face_encoding = ''
+
+class FaceTemplate(db.Model):
+    """Template encoding tambahan untuk satu identitas (selain encoding utama)."""
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    face_id = db.Column(db.Integer, db.ForeignKey('registered_faces.id', ondelete='CASCADE'), nullable=False, index=True)
+    # 'enroll' (foto enrollment tambahan) atau 'verify' (tangkapan verifikasi yang sangat yakin)
+    source = db.Column(db.String(20), nullable=False, default='enroll')
+    encoding_bin = db.Column(db.LargeBinary, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __tablename__ = 'face_templates'
+
+    def get_encoding(self):
+        return decode_encoding(self.encoding_bin)
+
+    def set_encoding(self, encoding):
+        self.encoding_bin = encode_encoding(encoding)
+
+class GalleryChange(db.Model):
+    """
+    Log perubahan enrollment (monoton naik menurut id). Setiap proses membaca entri
+    setelah posisi terakhirnya dan memuat ulang identitas yang berubah ke galerinya.
+    """
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    face_id = db.Column(db.Integer, nullable=False)
+    # 'register', 'update', 'delete', 'template'
+    op = db.Column(db.String(20), nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __tablename__ = 'gallery_changes'
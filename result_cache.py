@@ -0,0 +1,151 @@
+# result_cache.py
+
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# =============================================================================
+# CACHE HASIL BERDASARKAN HASH ISI UPLOAD
+# =============================================================================
+class ResultCache:
+    """
+    Cache LRU dengan TTL untuk hasil komputasi mahal (encoding, verdict liveness)
+    yang dikunci dengan hash SHA-256 dari byte upload. Nilai disimpan dalam bentuk
+    pickle sehingga ukuran memori bisa dibatasi secara tepat (`max_bytes`).
+
+    Jika `disk_path` diisi, cache juga memakai tier kedua berupa file SQLite yang
+    bisa dibagi antar worker process. File ini berisi pickle dan harus berada di
+    direktori yang hanya bisa ditulis oleh aplikasi.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, ttl=300, disk_path=None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.disk_path = disk_path
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._local = threading.local()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if disk_path:
+            with self._disk() as connection:
+                connection.execute(
+                    'CREATE TABLE IF NOT EXISTS result_cache (key TEXT PRIMARY KEY, expires_at REAL, value BLOB)'
+                )
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    @staticmethod
+    def key(data, namespace):
+        """Kunci cache: namespace (jenis pipeline) + hash isi file."""
+        return f"{namespace}:{hashlib.sha256(data).hexdigest()}"
+
+    def _disk(self):
+        # Satu koneksi SQLite per thread
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.disk_path, timeout=1.0, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            self._local.connection = connection
+        return connection
+
+    # -------------------------------------------------------------------------
+    # Operasi cache
+    # -------------------------------------------------------------------------
+    def get(self, key):
+        """Mengembalikan nilai untuk `key`, atau None jika tidak ada / kedaluwarsa."""
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, blob = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return pickle.loads(blob)
+                self._drop(key)
+
+        if self.disk_path:
+            try:
+                row = self._disk().execute(
+                    'SELECT expires_at, value FROM result_cache WHERE key = ?', (key,)
+                ).fetchone()
+            except sqlite3.Error:
+                row = None
+            if row is not None and row[0] > now:
+                with self._lock:
+                    self.disk_hits += 1
+                    self._store(key, row[0], row[1])
+                return pickle.loads(row[1])
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, value):
+        """Menyimpan nilai; entri paling lama tidak dipakai dibuang bila melebihi batas memori."""
+        if not self.enabled:
+            return
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._store(key, expires_at, blob)
+        if self.disk_path:
+            try:
+                connection = self._disk()
+                connection.execute(
+                    'INSERT OR REPLACE INTO result_cache (key, expires_at, value) VALUES (?, ?, ?)',
+                    (key, expires_at, blob)
+                )
+                connection.execute('DELETE FROM result_cache WHERE expires_at < ?', (time.time(),))
+            except sqlite3.Error:
+                pass
+
+    def _store(self, key, expires_at, blob):
+        if len(blob) > self.max_bytes:
+            return
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = (expires_at, blob)
+        self._bytes += len(blob)
+        while self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self.evictions += 1
+
+    def _drop(self, key):
+        _, blob = self._entries.pop(key)
+        self._bytes -= len(blob)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Ringkasan metrik cache."""
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+                'disk_path': os.path.abspath(self.disk_path) if self.disk_path else None,
+            }
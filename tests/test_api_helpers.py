@@ -0,0 +1,52 @@
+# tests/test_api_helpers.py
+
+import pytest
+from flask import Flask
+
+from api_helpers import allowed_file, busy_response, request_profile
+from app_config import configure_app
+from detection_profiles import ProfileSelector, load_profiles
+from inference_pool import PoolSaturated
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setenv('DETECTION_PROFILE_COMPARE', 'fast')
+    app = Flask(__name__)
+    configure_app(app)
+    app.config['DETECTION_PROFILE_STREAM'] = 'accurate'
+    return app
+
+
+@pytest.fixture
+def selector():
+    return ProfileSelector(load_profiles(), default='balanced')
+
+
+def test_request_profile_uses_endpoint_default(app, selector):
+    with app.test_request_context('/api/compare'):
+        assert request_profile(selector, 'compare').name == 'fast'
+        assert request_profile(selector, 'register').name == 'balanced'
+        assert request_profile(selector, 'stream').name == 'accurate'
+
+
+def test_request_profile_explicit_name_and_budget(app, selector):
+    with app.test_request_context('/api/compare', method='POST', data={'profile': 'accurate'}):
+        assert request_profile(selector, 'compare').name == 'accurate'
+    with app.test_request_context('/api/compare?latency_budget_ms=100'):
+        assert request_profile(selector, 'compare').name == 'fast'
+    with app.test_request_context('/api/compare?latency_budget_ms=cepat'):
+        with pytest.raises(ValueError):
+            request_profile(selector, 'compare')
+
+
+def test_busy_response_sets_retry_after():
+    body, status, headers = busy_response(PoolSaturated('Antrian inferensi penuh', retry_after=3))
+    assert status == 503 and headers == {'Retry-After': '3'}
+    assert 'sibuk' in body['message']
+
+
+def test_allowed_file():
+    assert allowed_file('foto.JPG')
+    assert not allowed_file('foto.bmp')
+    assert not allowed_file('foto')
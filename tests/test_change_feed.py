@@ -0,0 +1,102 @@
+# tests/test_change_feed.py
+
+import pytest
+
+from change_feed import ChangeFeed
+
+
+class FakeLog:
+    """Log perubahan di memori: hanya entri yang sudah 'commit' yang terlihat oleh fetch."""
+
+    def __init__(self):
+        self.committed = {}
+        self.calls = []
+
+    def commit(self, seq, face_id):
+        self.committed[seq] = face_id
+
+    def fetch(self, after, gaps):
+        self.calls.append((after, list(gaps)))
+        return sorted((seq, face_id) for seq, face_id in self.committed.items() if seq > after or seq in gaps)
+
+
+def poll(feed, log):
+    applied = []
+    feed.poll(log.fetch, applied.extend)
+    return sorted(applied)
+
+
+def test_reset_sets_start_position():
+    feed, log = ChangeFeed(interval=0), FakeLog()
+    log.commit(1, 10)
+    feed.reset(1)
+    assert poll(feed, log) == []
+    log.commit(2, 20)
+    assert poll(feed, log) == [20]
+    assert feed.position == 2 and feed.stats()['pending_gaps'] == 0
+
+
+def test_late_commit_with_lower_seq_is_applied_through_gap():
+    feed, log = ChangeFeed(interval=0), FakeLog()
+    feed.reset(0)
+    # Seq 2 dan 3 dialokasikan tetapi transaksinya belum commit saat seq 4 terlihat
+    log.commit(1, 10)
+    log.commit(4, 40)
+    assert poll(feed, log) == [10, 40]
+    assert feed.position == 4 and feed.stats()['pending_gaps'] == 2
+    assert log.calls[-1] == (0, [])
+
+    log.commit(3, 30)
+    assert poll(feed, log) == [30]
+    assert log.calls[-1] == (4, [2, 3])
+    assert feed.stats()['pending_gaps'] == 1
+    log.commit(2, 20)
+    assert poll(feed, log) == [20]
+    assert feed.stats()['pending_gaps'] == 0
+
+
+def test_gap_expires_after_timeout(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr('change_feed.time.monotonic', lambda: clock[0])
+    feed, log = ChangeFeed(interval=0, gap_timeout=5.0), FakeLog()
+    feed.reset(0)
+    log.commit(3, 30)
+    poll(feed, log)
+    assert feed.stats()['pending_gaps'] == 2
+    # Transaksi seq 1-2 di-rollback: celah dilepas setelah gap_timeout
+    clock[0] += 6.0
+    poll(feed, log)
+    assert feed.stats()['pending_gaps'] == 0
+    assert log.calls[-1] == (3, [1, 2])
+
+
+def test_large_jump_is_not_tracked_as_gaps():
+    feed, log = ChangeFeed(interval=0, max_gaps=10), FakeLog()
+    feed.reset(0)
+    log.commit(500, 5)
+    assert poll(feed, log) == [5]
+    assert feed.position == 500 and feed.stats()['pending_gaps'] == 0
+
+
+def test_failed_apply_keeps_position():
+    feed, log = ChangeFeed(interval=0), FakeLog()
+    feed.reset(0)
+    log.commit(1, 10)
+
+    def fail(face_ids):
+        raise RuntimeError('db down')
+
+    with pytest.raises(RuntimeError):
+        feed.poll(log.fetch, fail)
+    assert feed.position == 0
+    assert poll(feed, log) == [10]
+
+
+def test_due_respects_interval_and_busy_poll_returns_immediately():
+    feed, log = ChangeFeed(interval=60), FakeLog()
+    feed.reset(0)
+    assert feed.due()
+    poll(feed, log)
+    assert not feed.due()
+    with feed._lock:
+        assert feed.poll(log.fetch, lambda face_ids: None) == 0
@@ -0,0 +1,46 @@
+# tests/test_db_schema.py
+
+import pytest
+from flask import Flask
+from sqlalchemy import inspect, text
+
+import db_schema
+from models import db
+
+
+@pytest.fixture
+def legacy_app(tmp_path, monkeypatch):
+    """App dengan tabel registered_faces versi awal (tanpa kolom / tabel baru)."""
+    monkeypatch.setattr(db_schema, '_database_ready', False)
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'legacy.db'}"
+    db.init_app(app)
+    with app.app_context():
+        with db.engine.begin() as connection:
+            connection.execute(text(
+                'CREATE TABLE registered_faces (id INTEGER PRIMARY KEY, id_member INTEGER, nama VARCHAR(100) NOT NULL,'
+                ' file_path VARCHAR(200) NOT NULL, url_face_img VARCHAR(255), face_encoding TEXT NOT NULL)'
+            ))
+        yield app
+
+
+def test_prepare_database_upgrades_legacy_schema(legacy_app):
+    db_schema.prepare_database()
+    inspector = inspect(db.engine)
+    assert {'face_templates', 'gallery_changes'} <= set(inspector.get_table_names())
+    columns = {column['name'] for column in inspector.get_columns('registered_faces')}
+    assert {'face_encoding_bin', 'updated_at'} <= columns
+    assert ['id_member'] in [index['column_names'] for index in inspector.get_indexes('registered_faces')]
+
+
+def test_prepare_database_runs_once(legacy_app, monkeypatch):
+    db_schema.prepare_database()
+    monkeypatch.setattr(db_schema, 'ensure_tables', lambda: pytest.fail('langkah skema dijalankan ulang'))
+    db_schema.prepare_database()
+
+
+def test_schema_steps_are_idempotent(legacy_app):
+    assert db_schema.ensure_tables() == ['face_templates', 'gallery_changes']
+    assert db_schema.ensure_tables() == []
+    assert db_schema.ensure_column('updated_at')
+    assert not db_schema.ensure_column('updated_at')
@@ -0,0 +1,51 @@
+# tests/test_face_codec.py
+
+import json
+import numpy as np
+import pytest
+
+from face_codec import ENCODING_DIM, V1_SIZE, decode_encoding, decode_json, decode_many, encode_encoding
+
+
+def test_round_trip_preserves_float32_vector():
+    encoding = np.random.default_rng(0).normal(size=ENCODING_DIM)
+    blob = encode_encoding(encoding)
+    assert len(blob) == V1_SIZE == 1 + 4 * ENCODING_DIM
+    decoded = decode_encoding(blob)
+    assert decoded.dtype == np.float32 and decoded.shape == (ENCODING_DIM,)
+    np.testing.assert_array_equal(decoded, encoding.astype(np.float32))
+
+
+def test_decode_many_stacks_blobs_in_order():
+    encodings = np.random.default_rng(1).normal(size=(5, ENCODING_DIM)).astype(np.float32)
+    decoded = decode_many([encode_encoding(encoding) for encoding in encodings])
+    assert decoded.shape == (5, ENCODING_DIM) and decoded.flags['C_CONTIGUOUS']
+    np.testing.assert_array_equal(decoded, encodings)
+
+
+def test_decode_many_accepts_memoryview_and_empty_list():
+    blob = encode_encoding(np.ones(ENCODING_DIM))
+    np.testing.assert_array_equal(decode_many([memoryview(blob)])[0], np.ones(ENCODING_DIM, dtype=np.float32))
+    assert decode_many([]).shape == (0, ENCODING_DIM)
+
+
+def test_decode_rejects_truncated_blob():
+    blob = encode_encoding(np.zeros(ENCODING_DIM))
+    with pytest.raises(ValueError):
+        decode_encoding(blob[:-1])
+    with pytest.raises(ValueError):
+        decode_many([blob, blob + b'\x00'])
+
+
+def test_decode_rejects_unknown_version():
+    blob = bytearray(encode_encoding(np.zeros(ENCODING_DIM)))
+    blob[0] = 2
+    with pytest.raises(ValueError):
+        decode_encoding(bytes(blob))
+
+
+def test_decode_json_legacy_format():
+    encoding = [float(i) / ENCODING_DIM for i in range(ENCODING_DIM)]
+    decoded = decode_json(json.dumps(encoding))
+    assert decoded.dtype == np.float32
+    np.testing.assert_allclose(decoded, encoding, rtol=1e-6)
@@ -0,0 +1,68 @@
+# tests/test_face_tracking.py
+
+import pytest
+
+from face_tracking import FaceTrack, FaceTracker, box_iou
+
+
+def detection(top, right, bottom, left):
+    return {'location': (top, right, bottom, left)}
+
+
+def test_box_iou():
+    box = (0, 10, 10, 0)
+    assert box_iou(box, box) == 1.0
+    assert box_iou(box, (0, 20, 10, 10)) == 0.0
+    assert box_iou(box, (0, 15, 10, 5)) == pytest.approx(50 / 150)
+
+
+def test_update_matches_by_iou_and_creates_new_tracks():
+    tracker = FaceTracker(iou_threshold=0.3)
+    first = tracker.update([detection(0, 10, 10, 0), detection(0, 110, 10, 100)])
+    ids = [track.id for track, _ in first]
+    assert ids == [1, 2]
+
+    second = tracker.update([detection(0, 111, 10, 101), detection(1, 11, 11, 1), detection(50, 60, 60, 50)])
+    assert [track.id for track, _ in second] == [2, 1, 3]
+    assert second[0][0].box == (0, 111, 10, 101)
+    assert second[0][0].confidence > 0.3 and second[2][0].confidence == 0.0
+    assert all(track.frames == 2 for track, _ in second[:2])
+
+
+def test_lost_tracks_are_dropped_after_max_misses():
+    tracker = FaceTracker(max_misses=2)
+    tracker.update([detection(0, 10, 10, 0)])
+    for _ in range(2):
+        tracker.update([])
+    assert len(tracker.tracks) == 1
+    tracker.update([])
+    assert tracker.tracks == []
+
+
+def test_stable_boxes_only_for_encoded_tracks_within_reencode_window():
+    tracker = FaceTracker(reencode_every=3)
+    (track, _), = tracker.update([detection(0, 10, 10, 0)])
+    assert tracker.stable_boxes() == []
+    track.set_encoding([0.0], distance=0.1)
+    assert tracker.stable_boxes() == [(0, 10, 10, 0)]
+    tracker.update([detection(0, 10, 10, 0)])
+    assert tracker.stable_boxes() == [(0, 10, 10, 0)]
+    # Frame berikutnya mencapai `reencode_every`: encoding dihitung ulang
+    tracker.update([detection(0, 10, 10, 0)])
+    assert tracker.stable_boxes() == []
+    tracker.update([])
+    assert tracker.stable_boxes() == []
+
+
+def test_blink_counted_after_closed_then_open():
+    track = FaceTrack(1, (0, 10, 10, 0))
+    for ear in (0.3, 0.1, 0.3, None, 0.1, 0.1, 0.3):
+        track.observe_ear(ear, threshold=0.2)
+    assert track.blinks == 2 and track.ear == 0.3
+
+
+def test_blink_requires_min_closed_frames():
+    track = FaceTrack(1, (0, 10, 10, 0))
+    for ear in (0.1, 0.3, 0.1, 0.1, 0.3):
+        track.observe_ear(ear, threshold=0.2, min_closed_frames=2)
+    assert track.blinks == 1
@@ -0,0 +1,64 @@
+# tests/test_frame_stream.py
+
+import io
+
+import pytest
+
+from frame_stream import _part_body, iter_frames, multipart_boundary
+
+JPEG = b'\xff\xd8\xff\xe0JFIF\x00binary:data\r\n\r\nmore\xff\xd9'
+
+
+def multipart(parts, boundary=b'frame', closing=True, preamble=b''):
+    body = preamble
+    for part in parts:
+        body += b'--' + boundary + b'\r\n' + part + b'\r\n'
+    if closing:
+        body += b'--' + boundary + b'--\r\n'
+    return body
+
+
+def test_multipart_boundary():
+    assert multipart_boundary('multipart/x-mixed-replace; boundary=frame') == b'frame'
+    assert multipart_boundary('multipart/x-mixed-replace; charset=x; Boundary="a b"') == b'a b'
+    assert multipart_boundary('multipart/x-mixed-replace') is None
+    assert multipart_boundary(None) is None
+
+
+def test_part_body_with_headers():
+    part = b'\r\nContent-Type: image/jpeg\r\nContent-Length: 20\r\n\r\n' + JPEG + b'\r\n'
+    assert _part_body(part) == JPEG
+
+
+def test_part_body_with_empty_header_block():
+    assert _part_body(b'\r\n\r\n' + JPEG + b'\r\n') == JPEG
+
+
+def test_part_body_headerless_binary_with_colon_is_not_truncated():
+    # Body tanpa header yang memuat ':' lalu CRLF CRLF tidak boleh dianggap blok header
+    assert _part_body(b'\r\n' + JPEG + b'\r\n') == JPEG
+    assert _part_body(b'\r\n\x00raw:bytes\r\n\r\ntail\r\n') == b'\x00raw:bytes\r\n\r\ntail'
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 64 * 1024])
+def test_iter_frames_yields_each_part(chunk_size):
+    parts = [b'Content-Type: image/jpeg\r\n\r\n' + JPEG, b'\r\n' + b'second', JPEG]
+    stream = io.BytesIO(multipart(parts, preamble=b'ignored preamble\r\n'))
+    assert list(iter_frames(stream, b'frame', chunk_size=chunk_size)) == [JPEG, b'second', JPEG]
+
+
+def test_iter_frames_stops_at_closing_boundary():
+    body = multipart([b'\r\none']) + b'--frame\r\n\r\nafter-close\r\n'
+    assert list(iter_frames(io.BytesIO(body), b'frame')) == [b'one']
+
+
+def test_iter_frames_without_closing_boundary_keeps_last_part():
+    body = multipart([b'\r\none', b'\r\ntwo'], closing=False)
+    assert list(iter_frames(io.BytesIO(body), b'frame', chunk_size=3)) == [b'one', b'two']
+
+
+def test_iter_frames_rejects_oversized_part():
+    body = multipart([b'\r\n' + b'x' * 5000, b'\r\nsmall'])
+    frames = iter_frames(io.BytesIO(body), b'frame', max_frame_bytes=100, chunk_size=512)
+    with pytest.raises(ValueError):
+        list(frames)
@@ -0,0 +1,174 @@
+# tests/test_gallery.py
+
+import numpy as np
+import pytest
+
+from gallery import GalleryIndex, PartitionedGallery, aggregate_distances, template_key
+
+
+def unit(axis, dim=4, scale=1.0):
+    vector = np.zeros(dim, dtype=np.float32)
+    vector[axis] = scale
+    return vector
+
+
+def make_index(aggregate='min'):
+    index = GalleryIndex(dim=4, initial_capacity=2, aggregate=aggregate)
+    index.build([1, 2, 3], np.stack([unit(0), unit(1), unit(2)]))
+    return index
+
+
+# -----------------------------------------------------------------------------
+# Pencarian & perubahan inkremental
+# -----------------------------------------------------------------------------
+def test_search_returns_nearest_first_with_tolerance():
+    index = make_index()
+    assert index.search(unit(1), top_k=1) == [(2, 0.0)]
+    matches = index.search(unit(1) + unit(0, scale=0.1), top_k=3)
+    assert [face_id for face_id, _ in matches] == [2, 1, 3]
+    assert index.search(unit(3), tolerance=0.5) == []
+    assert index.best_match(unit(2), tolerance=0.1) == (3, 0.0)
+
+
+def test_search_many_matches_single_search():
+    index = make_index()
+    queries = np.stack([unit(0), unit(2), unit(1) * 0.5])
+    assert index.search_many(queries, top_k=2) == [index.search(query, top_k=2) for query in queries]
+    assert index.search_many(np.empty((0, 4))) == []
+
+
+def test_upsert_grows_capacity_and_replaces_existing():
+    index = make_index()
+    index.upsert(4, unit(3))
+    assert len(index) == 4 and index.template_count == 4
+    index.upsert(2, unit(3))
+    assert index.template_count == 4
+    np.testing.assert_array_equal(index.get(2), unit(3))
+    assert sorted(face_id for face_id, _ in index.search(unit(3), top_k=2)) == [2, 4]
+
+
+def test_remove_swaps_last_row_into_hole():
+    index = make_index()
+    assert index.remove(1)
+    assert not index.remove(1)
+    assert len(index) == 2 and 1 not in index
+    # Baris terakhir (ID 3) dipindah ke baris 0 dan tetap bisa dicari
+    assert index.search(unit(2)) == [(3, 0.0)]
+    assert index.search(unit(1)) == [(2, 0.0)]
+    np.testing.assert_array_equal(index.get(3), unit(2))
+    assert index.get(1) is None
+
+
+def test_remove_identity_with_templates_keeps_slots_consistent():
+    index = make_index()
+    index.upsert(1, unit(3), template_id=10)
+    index.upsert(2, unit(3, scale=2.0), template_id=11)
+    assert index.template_count == 5
+    assert index.remove(1)
+    assert index.template_count == 3 and len(index) == 2
+    assert index.template_keys(2) == [2, template_key(2, 11)]
+    # Slot identitas terakhir dipindah ke slot yang kosong; agregasi tetap benar
+    ids, dists = index.distances(unit(3, scale=2.0))
+    assert dict(zip(ids.tolist(), dists.tolist())) == pytest.approx({2: 0.0, 3: np.sqrt(5.0)})
+
+
+def test_remove_template_drops_identity_after_last_template():
+    index = make_index()
+    index.upsert(2, unit(3), template_id=7)
+    assert index.remove_template(2, 7)
+    assert not index.remove_template(2, 7)
+    assert 2 in index and index.template_count == 3
+    assert index.remove_template(2, 0)
+    assert 2 not in index and len(index) == 2
+
+
+# -----------------------------------------------------------------------------
+# Multi-template: agregasi jarak min / mean
+# -----------------------------------------------------------------------------
+@pytest.mark.parametrize('aggregate, expected', [('min', 0.0), ('mean', 1.0)])
+def test_template_aggregation(aggregate, expected):
+    index = make_index(aggregate)
+    index.upsert(1, unit(0, scale=3.0), template_id=5)
+    assert index.get_templates(1).shape == (2, 4)
+    distance = dict(index.search(unit(0), top_k=3))[1]
+    assert distance == pytest.approx(expected)
+    assert distance == pytest.approx(aggregate_distances([0.0, 2.0], aggregate))
+    batched = dict(index.search_many([unit(0)], top_k=3)[0])[1]
+    assert batched == pytest.approx(expected)
+
+
+def test_aggregate_distances_and_invalid_mode():
+    assert aggregate_distances([0.2, 0.6], 'min') == pytest.approx(0.2)
+    assert aggregate_distances([0.2, 0.6], 'mean') == pytest.approx(0.4)
+    with pytest.raises(ValueError):
+        GalleryIndex(aggregate='max')
+
+
+# -----------------------------------------------------------------------------
+# Pemeriksaan duplikat & reservasi registrasi
+# -----------------------------------------------------------------------------
+def test_find_duplicates_and_exclude():
+    index = make_index()
+    index.upsert(4, unit(0, scale=1.1))
+    conflicts = index.find_duplicates(unit(0), tolerance=0.2)
+    assert [face_id for face_id, _ in conflicts] == [1, 4]
+    assert index.find_duplicates(unit(0), tolerance=0.2, exclude_id=1)[0][0] == 4
+
+
+def test_reserve_blocks_parallel_registration_until_release():
+    index = make_index()
+    assert index.reserve(10, unit(3)) == []
+    assert [face_id for face_id, _ in index.reserve(11, unit(3, scale=1.05))] == [10]
+    assert index.reserve(10, unit(3)) == [(10, 0.0)]
+    index.release(10)
+    assert index.reserve(11, unit(3)) == []
+
+
+def test_export_and_adopt_round_trip():
+    index = make_index()
+    index.upsert(2, unit(3), template_id=9)
+    arrays = index.export_arrays()
+    copy = GalleryIndex(dim=4)
+    copy.adopt({name: array.copy() for name, array in arrays.items()}, index.template_count, len(index))
+    assert copy.template_keys(2) == index.template_keys(2)
+    assert copy.search(unit(3), top_k=3) == index.search(unit(3), top_k=3)
+
+
+# -----------------------------------------------------------------------------
+# Galeri terpartisi
+# -----------------------------------------------------------------------------
+def make_partitioned():
+    gallery = PartitionedGallery(dim=4)
+    gallery.build([1, 2, 3], np.stack([unit(0), unit(1), unit(2)]), partitions=[7, 7, 8])
+    return gallery
+
+
+def test_partition_scoped_and_merged_search():
+    gallery = make_partitioned()
+    assert gallery.template_count == 3
+    assert gallery.search(unit(2), partition=7, top_k=1)[0][0] in (1, 2)
+    assert gallery.search(unit(2), partition=8) == [(3, 0.0)]
+    assert gallery.search(unit(2), partition=99) == []
+    assert [face_id for face_id, _ in gallery.search(unit(0), top_k=3)] == [1, 2, 3]
+    assert gallery.search_many([unit(1), unit(2)], partition=8) == [[(3, pytest.approx(np.sqrt(2.0)))], [(3, 0.0)]]
+
+
+def test_partition_move_and_remove_drops_empty_partition():
+    gallery = make_partitioned()
+    gallery.upsert(3, unit(3), template_id=4)
+    assert gallery.move(3, 7)
+    assert not gallery.move(3, 7)
+    assert gallery.partition_of(3) == 7 and gallery.template_count == 4
+    assert [stats['partition'] for stats in gallery.partition_stats()] == [7]
+    assert len(gallery.get_templates(3)) == 2
+    assert gallery.remove(3) and not gallery.remove(3)
+    assert gallery.template_count == 2
+
+
+def test_partitioned_duplicates_cross_partitions():
+    gallery = make_partitioned()
+    assert [face_id for face_id, _ in gallery.find_duplicates(unit(2), tolerance=0.1)] == [3]
+    assert gallery.reserve(20, unit(3)) == []
+    assert gallery.reserve(21, unit(3))[0][0] == 20
+    gallery.release(20)
+    assert gallery.reserve(21, unit(3)) == []
@@ -0,0 +1,114 @@
+# tests/test_job_queue.py
+
+import sqlite3
+import time
+
+import pytest
+
+from job_queue import JobQueue, JobWorkers
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(str(tmp_path / 'jobs.sqlite'), stale_after=60, keep_seconds=3600, max_attempts=2)
+
+
+def backdate(queue, job_id, seconds, column='heartbeat_at'):
+    queue._connection().execute(f'UPDATE jobs SET {column} = {column} - ? WHERE id = ?', (seconds, job_id))
+
+
+def test_claim_is_fifo_and_exclusive(queue):
+    first = queue.submit('register', {'id': 1}, b'photo-1')
+    second = queue.submit('register', {'id': 2})
+    job = queue.claim('w1')
+    assert job['id'] == first and job['params'] == {'id': 1} and job['data'] == b'photo-1' and job['attempts'] == 1
+    assert queue.get(second)['position'] == 0
+    assert queue.claim('w2')['id'] == second
+    assert queue.claim('w3') is None
+    assert queue.stats() == {'queued': 0, 'running': 2, 'done': 0, 'failed': 0}
+
+
+def test_finish_stores_result_and_drops_data(queue):
+    job_id = queue.submit('register', {}, b'photo')
+    queue.claim('w1')
+    queue.progress(job_id, 'encode')
+    assert queue.get(job_id)['progress'] == 'encode'
+    queue.finish(job_id, {'message': 'ok'}, 201)
+    job = queue.get(job_id)
+    assert job['status'] == 'done' and job['status_code'] == 201 and job['result'] == {'message': 'ok'}
+    assert queue._connection().execute('SELECT data FROM jobs WHERE id = ?', (job_id,)).fetchone()[0] is None
+    failed = queue.submit('register', {})
+    queue.claim('w1')
+    queue.finish(failed, {'message': 'busy'}, 503)
+    assert queue.get(failed)['status'] == 'failed'
+
+
+def test_live_worker_heartbeat_prevents_requeue(queue):
+    job_id = queue.submit('register', {})
+    queue.claim('w1')
+    # Job sudah lama berjalan, tetapi worker masih memperbarui heartbeat
+    backdate(queue, job_id, 600, column='started_at')
+    queue.heartbeat(job_id)
+    assert queue.maintain() == (0, 0)
+    assert queue.get(job_id)['status'] == 'running'
+
+
+def test_stale_heartbeat_requeues_then_fails_after_max_attempts(queue):
+    job_id = queue.submit('register', {})
+    queue.claim('w1')
+    backdate(queue, job_id, 120)
+    assert queue.maintain() == (1, 0)
+    assert queue.get(job_id)['status'] == 'queued'
+
+    assert queue.claim('w2')['attempts'] == 2
+    queue.progress(job_id, 'encode')
+    assert queue.maintain() == (0, 0)
+    backdate(queue, job_id, 120)
+    queue.maintain()
+    job = queue.get(job_id)
+    assert job['status'] == 'failed' and job['status_code'] == 500
+
+
+def test_maintain_purges_old_finished_jobs(queue):
+    job_id = queue.submit('register', {})
+    queue.claim('w1')
+    queue.finish(job_id, {}, 201)
+    backdate(queue, job_id, 7200, column='finished_at')
+    assert queue.maintain() == (0, 1)
+    assert queue.get(job_id) is None
+
+
+def test_legacy_queue_file_gets_heartbeat_column(tmp_path):
+    path = str(tmp_path / 'old.sqlite')
+    connection = sqlite3.connect(path)
+    connection.execute(
+        'CREATE TABLE jobs (id TEXT PRIMARY KEY, kind TEXT NOT NULL, status TEXT NOT NULL, params TEXT,'
+        ' data BLOB, progress TEXT, result TEXT, status_code INTEGER, attempts INTEGER DEFAULT 0,'
+        ' worker TEXT, created_at REAL, started_at REAL, finished_at REAL)'
+    )
+    connection.commit()
+    connection.close()
+    queue = JobQueue(path)
+    job_id = queue.submit('register', {})
+    queue.claim('w1')
+    assert queue.get(job_id)['heartbeat_at'] is not None
+
+
+def test_workers_run_handler_and_record_failures(queue):
+    def handler(job, progress):
+        progress('working')
+        if job['params'].get('fail'):
+            raise RuntimeError('boom')
+        return {'id': job['params']['id']}, 201
+
+    workers = JobWorkers(queue, handler, workers=2, poll_interval=0.05)
+    ok = queue.submit('register', {'id': 1})
+    bad = queue.submit('register', {'id': 2, 'fail': True})
+    workers.notify()
+    deadline = time.time() + 5
+    while workers.stats()['processed'] < 2 and time.time() < deadline:
+        time.sleep(0.02)
+    workers.stop(timeout=5)
+    assert queue.get(ok)['status_code'] == 201
+    assert queue.get(bad)['status'] == 'failed' and queue.get(bad)['result'] == {'message': 'Terjadi kesalahan internal'}
+    assert workers.stats()['failed'] == 1